@@ -1,13 +1,74 @@
 import os
 import csv
-import base64
+import json
+import time
+import random
+import threading
 import requests
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from job_queue import JobQueue
+from result_cache import ResultCache
+from image_sources import iter_image_sources, source_name, encode_image
 
 DEFAULT_IMAGE_DIR = os.path.join(os.getcwd(), "/IM_TEXT_DESCRIPTION")
 DEFAULT_QUESTIONS_PATH = os.path.join(os.getcwd(), "questions_to_ask.txt")
 OUTPUT_DIR = os.path.join(os.getcwd(), "OUTPUT")
 
+# OPENAI_API_URL lets runs point at another endpoint (e.g. the stub in benchmark_reviewer.py)
+API_URL = os.getenv('OPENAI_API_URL', "https://api.openai.com/v1/chat/completions")
+VISION_MODEL = "gpt-4o-preview"
+DESCRIPTION_PROMPT = "Please provide a detailed description of this image."
+
+# Ask for the description and all answers in one structured (JSON) request instead of one request each.
+# Answers missing from the combined reply are asked for individually.
+COMBINED_REQUEST = True
+COMBINED_MAX_TOKENS = 4000
+
+# Images analysed in parallel, each worker thread reusing one keep-alive connection.
+# Rate-limit (429) and server (5xx) errors are retried with exponential backoff.
+MAX_CONCURRENT_IMAGES = 4
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 1.0
+REQUEST_TIMEOUT = (10, 120)  # (connect, read) seconds
+
+# Durable (image, question) work queue kept in OUTPUT_DIR - a re-run resumes where the last one stopped.
+# Each item gets this many attempts (on top of the HTTP retries above) before it's marked failed.
+JOB_QUEUE_FILE = "job_queue.sqlite3"
+MAX_JOB_ATTEMPTS = 3
+
+_thread_state = threading.local()
+
+def get_session():
+    """Pooled keep-alive session for the current thread"""
+    session = getattr(_thread_state, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        _thread_state.session = session
+    return session
+
+def post_with_retries(url, headers, payload):
+    """POST, retrying 429/5xx responses and connection errors with exponential backoff and jitter"""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = get_session().post(url, headers=headers, json=payload, timeout=REQUEST_TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = BACKOFF_SECONDS * 2 ** attempt
+            print(f"Request failed ({type(e).__name__}), retrying in {delay:.1f}s")
+        else:
+            if (response.status_code != 429 and response.status_code < 500) or attempt == MAX_RETRIES:
+                return response
+            # Honour the server's Retry-After when it gives one
+            retry_after = response.headers.get("Retry-After")
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else BACKOFF_SECONDS * 2 ** attempt
+            print(f"API returned {response.status_code}, retrying in {delay:.1f}s")
+        time.sleep(delay + random.uniform(0, delay / 4))
+
 def get_api_key():
     api_key = os.getenv('OPENAI_API_KEY')
     if not api_key:
@@ -28,38 +89,30 @@ def read_questions(questions_path):
     with open(questions_path, 'r') as file:
         return [line.strip() for line in file if line.strip()]
 
-def encode_image(image_path):
-    with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode('utf-8')
-
-def analyze_image(image_path, questions, api_key):
-    base64_image = encode_image(image_path)
-    
+def ask_vision_model(prompt, base64_image, api_key, max_tokens=500, json_response=False):
+    """Send one prompt plus the image and return the model's reply text"""
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {api_key}"
     }
     
     payload = {
-        "model": "gpt-4o-preview",
+        "model": VISION_MODEL,
         "messages": [
             {
                 "role": "user",
                 "content": [
-                    {"type": "text", "text": "Please provide a detailed description of this image."},
+                    {"type": "text", "text": prompt},
                     {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}}
                 ]
             }
         ],
-        "max_tokens": 500
+        "max_tokens": max_tokens
     }
+    if json_response:
+        payload["response_format"] = {"type": "json_object"}
     
-    # Get general description
-    response = requests.post(
-        "https://api.openai.com/v1/chat/completions",
-        headers=headers,
-        json=payload
-    )
+    response = post_with_retries(API_URL, headers, payload)
     
     if response.status_code != 200:
         raise Exception(f"API Error: {response.status_code} - {response.text}")
@@ -68,29 +121,108 @@ def analyze_image(image_path, questions, api_key):
     if 'error' in response_data:
         raise Exception(f"API Error: {response_data['error']}")
         
-    description = response_data['choices'][0]['message']['content']
-    
-    # Now get answers to specific questions
+    return response_data['choices'][0]['message']['content']
+
+def build_combined_prompt(questions, include_description=True):
+    """One prompt asking for the description (optionally) and every answer as a JSON object"""
+    numbered = "\n".join(f"{i+1}. {question}" for i, question in enumerate(questions))
+    if include_description:
+        intro = f"{DESCRIPTION_PROMPT}\n\nThen answer each of these questions about the image:"
+        form = '{"description": "<detailed description>", "answers": {"1": "<answer to question 1>", "2": "..."}}'
+    else:
+        intro = "Answer each of these questions about the image:"
+        form = '{"answers": {"1": "<answer to question 1>", "2": "..."}}'
+    return (
+        f"{intro}\n{numbered}\n\n"
+        f"Reply with a JSON object only, in the form {form}, "
+        "with one entry in \"answers\" per question, keyed by its number."
+    )
+
+def parse_combined_response(text, num_questions):
+    """Description and answers from a combined reply; anything missing or malformed comes back as None"""
+    text = text.strip()
+    if text.startswith("```"):
+        # Strip a markdown code fence if the model added one anyway
+        text = text.strip("`")
+        text = text[text.find("{"):]
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return None, [None] * num_questions
+    if not isinstance(data, dict):
+        return None, [None] * num_questions
+
+    description = data.get("description")
+    if not isinstance(description, str) or not description.strip():
+        description = None
+
+    raw_answers = data.get("answers")
+    if isinstance(raw_answers, list):
+        raw_answers = {str(i+1): answer for i, answer in enumerate(raw_answers)}
+    if not isinstance(raw_answers, dict):
+        raw_answers = {}
     answers = []
-    for question in questions:
-        payload["messages"][0]["content"][0]["text"] = question
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json=payload
-        )
-        
-        if response.status_code != 200:
-            raise Exception(f"API Error: {response.status_code} - {response.text}")
-            
-        response_data = response.json()
-        if 'error' in response_data:
-            raise Exception(f"API Error: {response_data['error']}")
-            
-        answers.append(response_data['choices'][0]['message']['content'])
-    
+    for i in range(num_questions):
+        answer = raw_answers.get(str(i+1))
+        if isinstance(answer, (int, float)) and not isinstance(answer, bool):
+            answer = str(answer)
+        answers.append(answer if isinstance(answer, str) and answer.strip() else None)
     return description, answers
 
+def answer_prompts(image_path, prompts, api_key, combined=COMBINED_REQUEST):
+    """Ask each prompt about one image; returns {prompt: reply} with the exception in place of failed replies.
+
+    DESCRIPTION_PROMPT among the prompts is asked as the description. A failure only
+    affects its own prompt, so the others can still be stored.
+    """
+    base64_image = encode_image(image_path)  # Encoded once, however many requests follow
+    results = {}
+    questions = [prompt for prompt in prompts if prompt != DESCRIPTION_PROMPT]
+    include_description = DESCRIPTION_PROMPT in prompts
+
+    # Ask for the description and all questions in one request
+    if combined and len(prompts) > 1:
+        try:
+            reply = ask_vision_model(
+                build_combined_prompt(questions, include_description=include_description),
+                base64_image, api_key,
+                max_tokens=min(500 * len(prompts), COMBINED_MAX_TOKENS),
+                json_response=True
+            )
+            description, answers = parse_combined_response(reply, len(questions))
+            if include_description and description is not None:
+                results[DESCRIPTION_PROMPT] = description
+            results.update((question, answer) for question, answer in zip(questions, answers) if answer is not None)
+        except Exception as e:
+            print(f"Combined request failed ({str(e)}) - asking separately")
+        still_missing = len(prompts) - len(results)
+        if still_missing:
+            print(f"Combined reply was missing {still_missing} item(s) - asking for those separately")
+
+    # Ask whatever is still missing one prompt at a time
+    for prompt in prompts:
+        if prompt not in results:
+            try:
+                results[prompt] = ask_vision_model(prompt, base64_image, api_key)
+            except Exception as e:
+                results[prompt] = e
+    return results
+
+def timed_answer_prompts(image_path, prompts, api_key):
+    start = time.perf_counter()
+    results = answer_prompts(image_path, prompts, api_key)
+    return results, time.perf_counter() - start
+
+def write_rows(descriptions_writer, responses_writer, data, questions):
+    """Write an image's rows; cells that failed for good are left blank (they're listed at the end of the run)"""
+    seconds = 'cached' if data['seconds'] is None else f"{data['seconds']:.2f}"
+    cells = {prompt: '' if value is None else value for prompt, value in data['cells'].items()}
+    descriptions_writer.writerow([data['filename'], cells[DESCRIPTION_PROMPT], seconds])
+    responses_writer.writerow([data['filename']] + [cells[question] for question in questions])
+
+def is_complete(data):
+    return None not in data['cells'].values()
+
 def main():
     # Create output directory if it doesn't exist
     os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -104,42 +236,120 @@ def main():
     
     # Read questions
     questions = read_questions(questions_path)
+    prompts = [DESCRIPTION_PROMPT] + questions
     
     # Prepare CSV files
     descriptions_file = os.path.join(OUTPUT_DIR, "images_descriptions.csv")
     responses_file = os.path.join(OUTPUT_DIR, "responses.csv")
     
-    # Process images
+    # Answers are stored per (image content hash, model, question), so only missing cells are queued.
+    # The queue is durable: an interrupted run resumes with whatever was left, and each
+    # (image, question) item is retried up to MAX_JOB_ATTEMPTS times on its own.
+    cache = ResultCache()
+    queue = JobQueue(os.path.join(OUTPUT_DIR, JOB_QUEUE_FILE))
+    queue.begin_run()
     image_data = []
-    for filename in os.listdir(image_dir):
-        if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-            print(f"Processing {filename}...")
-            image_path = os.path.join(image_dir, filename)
-            try:
-                description, answers = analyze_image(image_path, questions, api_key)
-                image_data.append({
-                    'filename': filename,
-                    'description': description,
-                    'answers': answers
-                })
-            except Exception as e:
-                print(f"Error processing {filename}: {str(e)}")
-    
-    # Save descriptions
-    with open(descriptions_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Filename', 'Description'])
+    images_by_hash = {}
+    # Video files are sampled into frames on the fly (see image_sources.py)
+    for image_path in iter_image_sources(image_dir):
+        filename = source_name(image_path)
+        try:
+            content_hash = cache.content_hash(image_path)
+        except Exception as e:
+            print(f"Error processing {filename}: {str(e)}")
+            continue
+        cells = {prompt: cache.get_response(content_hash, VISION_MODEL, prompt) for prompt in prompts}
+        data = {'filename': filename, 'cells': cells, 'seconds': None}
+        image_data.append(data)
+        images_by_hash.setdefault(content_hash, []).append(data)
+        for prompt, value in cells.items():
+            if value is None:
+                queue.add(content_hash, image_path, filename, VISION_MODEL, prompt)
+    queue.commit()
+    counts = queue.status_counts()
+    print(f"{len(image_data)} images, {counts.get('pending', 0)} question(s) to compute")
+
+    with open(descriptions_file, 'w', newline='', encoding='utf-8') as descriptions_f, \
+         open(responses_file, 'w', newline='', encoding='utf-8') as responses_f:
+        descriptions_writer = csv.writer(descriptions_f)
+        responses_writer = csv.writer(responses_f)
+        descriptions_writer.writerow(['Filename', 'Description', 'Seconds'])
+        responses_writer.writerow(['Filename'] + [f'Q{i+1}' for i in range(len(questions))])
         for data in image_data:
-            writer.writerow([data['filename'], data['description']])
-    
-    # Save responses
-    with open(responses_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        header = ['Filename'] + [f'Q{i+1}' for i in range(len(questions))]
-        writer.writerow(header)
+            if is_complete(data):
+                write_rows(descriptions_writer, responses_writer, data, questions)
+        descriptions_f.flush()
+        responses_f.flush()
+
+        # The queue and cache are only touched from this thread; worker threads just make the API calls
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_IMAGES) as executor:
+            while True:
+                # Keep the pool fed, one image (all its pending questions) per task
+                while len(in_flight) < MAX_CONCURRENT_IMAGES * 2:
+                    claimed = queue.claim_image()
+                    if claimed is None:
+                        break
+                    content_hash, image_path, filename, jobs = claimed
+                    print(f"Processing {filename}... ({len(jobs)} of {len(prompts)} cells to compute)")
+                    future = executor.submit(timed_answer_prompts, image_path, [job[2] for job in jobs], api_key)
+                    in_flight[future] = (content_hash, filename, jobs)
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    content_hash, filename, jobs = in_flight.pop(future)
+                    try:
+                        results, seconds = future.result()
+                    except Exception as e:  # e.g. the image couldn't be read
+                        results, seconds = {job[2]: e for job in jobs}, 0.0
+                    for job_id, model, prompt in jobs:
+                        result = results[prompt]
+                        if isinstance(result, Exception):
+                            print(f"Error processing {filename}: {str(result)}")
+                            queue.mark_failed(job_id, result, MAX_JOB_ATTEMPTS)
+                            continue
+                        cache.put_response(content_hash, model, prompt, result)
+                        queue.mark_done(job_id)
+                        for data in images_by_hash.get(content_hash, []):
+                            data['cells'][prompt] = result
+
+                    for data in images_by_hash.get(content_hash, []):
+                        data['seconds'] = (data['seconds'] or 0.0) + seconds
+                    if queue.outstanding(content_hash):
+                        continue  # Some questions will be retried
+                    # Write the finished image straight away so a crash loses nothing - including
+                    # its other answers when a question has failed for good
+                    for data in images_by_hash.get(content_hash, []):
+                        write_rows(descriptions_writer, responses_writer, data, questions)
+                        print(f"Finished {data['filename']} in {data['seconds']:.1f}s")
+                    descriptions_f.flush()
+                    responses_f.flush()
+
+    failures = queue.failures()
+    queue.close()
+    cache.close()
+
+    # Rewrite both files in listing order now that everything has finished (failed cells blank)
+    descriptions_tmp, responses_tmp = descriptions_file + ".tmp", responses_file + ".tmp"
+    with open(descriptions_tmp, 'w', newline='', encoding='utf-8') as descriptions_f, \
+         open(responses_tmp, 'w', newline='', encoding='utf-8') as responses_f:
+        descriptions_writer = csv.writer(descriptions_f)
+        responses_writer = csv.writer(responses_f)
+        descriptions_writer.writerow(['Filename', 'Description', 'Seconds'])
+        responses_writer.writerow(['Filename'] + [f'Q{i+1}' for i in range(len(questions))])
         for data in image_data:
-            writer.writerow([data['filename']] + data['answers'])
-    
+            write_rows(descriptions_writer, responses_writer, data, questions)
+    os.replace(descriptions_tmp, descriptions_file)
+    os.replace(responses_tmp, responses_file)
+
+    if failures:
+        print(f"\n{len(failures)} question(s) failed after {MAX_JOB_ATTEMPTS} attempts - left blank in the CSVs "
+              f"(re-run to retry them):")
+        for filename, prompt, attempts, error in failures:
+            print(f"  {filename}: {prompt[:60]} - {error}")
+
     print(f"\nAnalysis complete!")
     print(f"Descriptions saved to: {descriptions_file}")
     print(f"Responses saved to: {responses_file}")
@@ -1,10 +1,18 @@
 import os
 import csv
+import time
+import numpy as np
 import matplotlib.pyplot as plt
 from PIL import Image
-from ultralytics import YOLO
+from detector_backend import load_detector
 import tkinter as tk
 from tkinter import filedialog, messagebox
+from image_dedupe import group_near_duplicates
+from result_cache import ResultCache
+from image_sources import iter_image_sources, source_name, source_size
+from detector_setup import build_detector, detect_group
+from detection_store import DETECTIONS_DIR, DetectionWriter, clear_detection_store
+from detection_stats import read_categories, build_category_lookup, class_ids_named, count_detections, describe_counts
 
 
 def select_directory(prompt):
@@ -19,8 +27,46 @@ def select_file(prompt):
     file_path = filedialog.askopenfilename(title=prompt)
     return file_path
 
+# Group runs of near-identical consecutive frames and analyse one representative per group.
+# Off by default: every member is counted with its representative's people count, so a worker
+# too small to change the hash would be miscounted. Only for fixed cameras with static scenes.
+DEDUPE_FRAMES = False
+DEDUPE_MAX_DISTANCE = 2  # Max differing hash bits (out of 256) for two frames to count as the same shot
+
+# Reuse detections (and vision descriptions) stored by earlier runs, so only new or changed images are analysed
+USE_RESULT_CACHE = True
+DETECTOR_MODEL = 'yolov8n.pt'
+
+# CPU inference backend: 'torch', or an exported and cached 'onnx' / 'openvino' graph (see benchmark_backends.py)
+DETECTOR_BACKEND = 'torch'
+DETECTOR_INT8 = False  # Quantized graph - onnx and openvino backends only
+
+# Video and time-lapse files in the image folder are sampled every VIDEO_FRAME_INTERVAL seconds
+# (or every VIDEO_FRAME_STRIDE frames, if set) and decoded on the fly - no frames are written to disk
+VIDEO_FRAME_INTERVAL = 5.0
+VIDEO_FRAME_STRIDE = None
+
+# Tiled detection finds small, distant people in high-resolution photos (slower - see tiled_detection.py)
+TILED_DETECTION = False
+TILE_SIZE = 640
+TILE_OVERLAP = 0.2
+
+# Cascade mode runs DETECTOR_MODEL on every image and re-runs only images with uncertain
+# person detections through CASCADE_LARGE_MODEL (see detector_cascade.py)
+DETECTOR_CASCADE = False
+CASCADE_LARGE_MODEL = 'yolov8m.pt'
+
+# Save every box, class and confidence to OUTPUT/detections/ so the statistics can be re-sliced
+# later (e.g. a confidence threshold or the lower third of the frame) with slice_detections.py
+STORE_DETECTIONS = True
+
 # Initialize YOLO model
-model = YOLO('yolov8n.pt')  # Load YOLOv8 nano model
+model = load_detector(DETECTOR_MODEL, DETECTOR_BACKEND, DETECTOR_INT8)  # Load YOLOv8 nano model
+cache = ResultCache() if USE_RESULT_CACHE else None
+detect_fn, detector_key = build_detector(
+    model, DETECTOR_MODEL, DETECTOR_BACKEND, DETECTOR_INT8, TILE_SIZE if TILED_DETECTION else None, TILE_OVERLAP,
+    CASCADE_LARGE_MODEL if DETECTOR_CASCADE else None
+)
 
 # Try to find specific image directory first, fall back to user selection if not found
 default_image_dir = "/Users/nathankirchner/Workstuff/Projects/GWA_Reviewer/20250214 Raw Data IMS"
@@ -40,74 +86,102 @@ else:
 if not categories_file:
     raise ValueError("No categories file selected")
 
-# Read categories
-with open(categories_file, 'r') as f:
-    categories = [line.strip() for line in f.readlines()]
+# Read categories and resolve them once against the model's classes
+categories = read_categories(categories_file)
+category_lookup = build_category_lookup(model.names, categories)  # class id -> category index (-1 if none)
+person_class_ids = class_ids_named(model.names, 'person')
+
+# Try to find specific output directory first, fall back to user selection if not found
+default_save_dir = "/Users/nathankirchner/Workstuff/Projects/GWA_Reviewer/OUTPUT"
+if os.path.exists(default_save_dir):
+    save_dir = default_save_dir
+else:
+    save_dir = select_directory("Folder 'OUTPUT' not found. Please select directory to save results")
+if not save_dir:
+    raise ValueError("No save directory selected")
 
 # Initialize counters
-category_counts = {category: 0 for category in categories}
+category_counts = np.zeros(len(categories), dtype=np.int64)
 total_images = 0
 person_count_distribution = {0: 0}  # Initialize with 0 people count
 
+# Columnar store of all detections from this run
+if STORE_DETECTIONS:
+    detection_dir = os.path.join(save_dir, DETECTIONS_DIR)
+    clear_detection_store(detection_dir)
+    detection_writer = DetectionWriter(detection_dir, model.names)
+
 # Initialize before the image processing loop
 image_data_list = []
 
+# Collect images and sampled video frames, grouping near-identical frames so each group is only analysed once
+image_paths = list(iter_image_sources(image_dir, VIDEO_FRAME_STRIDE, VIDEO_FRAME_INTERVAL))
+if DEDUPE_FRAMES:
+    if cache:
+        frame_groups = group_near_duplicates(image_paths, DEDUPE_MAX_DISTANCE, hash_fn=cache.perceptual_hash)
+    else:
+        frame_groups = group_near_duplicates(image_paths, DEDUPE_MAX_DISTANCE)
+    print(f"Grouped {len(image_paths)} images into {len(frame_groups)} groups of near-identical frames")
+else:
+    frame_groups = [[image_path] for image_path in image_paths]
+
 # Analyze images
-for filename in os.listdir(image_dir):
-    if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-        image_path = os.path.join(image_dir, filename)
-        try:
-            # Analyze image
-            print(f"Analysing {filename}")
-            results = model(image_path)[0]  # Get results for first image
-            detected_classes = results.boxes.cls  # Get class indices
-            class_names = [results.names[int(cls)] for cls in detected_classes]  # Convert to class names
-            
-            # Count people in this image
-            people_count = class_names.count('person')
-            print(f"FOUND: {class_names} (People count: {people_count})")
-            
-            # Update person count distribution
-            if people_count in person_count_distribution:
-                person_count_distribution[people_count] += 1
-            else:
-                person_count_distribution[people_count] = 1
-
-            # Count matching categories (check all detected objects)
-            for detected_class in class_names:
-                for category in categories:
-                    if category.lower() in detected_class.lower():
-                        category_counts[category] += 1
-                        break
-
-            # Add image data to list
+run_start = time.perf_counter()
+for group in frame_groups:
+    filename = source_name(group[0])
+    group_size = len(group)
+    try:
+        # Analyze image
+        image_path, detections, content_hash, cached = detect_group(group, detect_fn, detector_key, cache)
+        print(f"Analysed {filename}{' (cached)' if cached else ''}")
+        if STORE_DETECTIONS:
+            detection_writer.add(filename, detections, weight=group_size)
+        detected_classes = detections['cls']  # Get class indices
+        class_counts, image_category_counts = count_detections(detected_classes, category_lookup, len(categories))
+        found = describe_counts(class_counts, model.names)
+        
+        # Count people in this image
+        people_count = int(class_counts[person_class_ids].sum())
+        print(f"FOUND: {found} (People count: {people_count})")
+        
+        # Update person count distribution
+        if people_count in person_count_distribution:
+            person_count_distribution[people_count] += group_size
+        else:
+            person_count_distribution[people_count] = group_size
+
+        # Count matching categories (each detected object counts towards its first matching category)
+        category_counts += image_category_counts * group_size
+
+        # Add image data to list (one entry per group member)
+        for member_path in group:
             image_data = {
-                'elements': class_names,
-                'size': os.path.getsize(image_path),
+                'elements': list(found),
+                'size': source_size(member_path),
                 'anomalies': []  # Add anomalies if you detect any
             }
             image_data_list.append(image_data)
-            
-            total_images += 1
-        except Exception as e:
-            print(f"Error processing {filename}: {str(e)}")
+        
+        total_images += group_size
+    except Exception as e:
+        print(f"Error processing {filename}: {str(e)}")
+
+if STORE_DETECTIONS:
+    detection_writer.close()
+
+# Report the end-to-end throughput, and how much of the work the cascade escalated
+run_seconds = time.perf_counter() - run_start
+print(f"\nAnalysed {total_images} images in {run_seconds:.1f}s ({total_images / run_seconds if run_seconds else 0:.2f} images/s end-to-end)")
+if DETECTOR_CASCADE:
+    print(detect_fn.summary())
 
 # Create first pie chart (original categories)
 plt.figure(figsize=(10, 8))
-labels = [f"{cat} ({count})" for cat, count in category_counts.items() if count > 0]
-values = [count for count in category_counts.values() if count > 0]
+labels = [f"{cat} ({count})" for cat, count in zip(categories, category_counts) if count > 0]
+values = [count for count in category_counts if count > 0]
 plt.pie(values, labels=labels, autopct='%1.1f%%')
 plt.title('Image Category Distribution')
 
-# Try to find specific output directory first, fall back to user selection if not found
-default_save_dir = "/Users/nathankirchner/Workstuff/Projects/GWA_Reviewer/OUTPUT"
-if os.path.exists(default_save_dir):
-    save_dir = default_save_dir
-else:
-    save_dir = select_directory("Folder 'OUTPUT' not found. Please select directory to save results")
-if not save_dir:
-    raise ValueError("No save directory selected")
-
 # Save first pie chart
 chart_path = os.path.join(save_dir, 'category_distribution_pie_chart.png')
 plt.savefig(chart_path)
@@ -132,7 +206,7 @@ with open(csv_path, 'w', newline='') as f:
     # First section: Category distribution
     writer.writerow(['Category Distribution'])
     writer.writerow(['Category', 'Count', 'Percentage'])
-    for category, count in category_counts.items():
+    for category, count in zip(categories, category_counts):
         percentage = (count / total_images * 100) if total_images > 0 else 0
         writer.writerow([category, count, f"{percentage:.1f}%"])
     
@@ -1,12 +1,22 @@
 import os
 import csv
-import matplotlib.pyplot as plt
+import time
 from PIL import Image
-from ultralytics import YOLO
+from detector_backend import load_detector
 import tkinter as tk
 from tkinter import filedialog, messagebox
+from image_dedupe import perceptual_hash, group_near_duplicates, iter_near_duplicate_groups
+from result_cache import ResultCache
+from image_sources import iter_image_sources, source_name, source_size, encode_image
+from detector_setup import build_detector, detect_group
+from detection_stats import read_categories, build_category_lookup, class_ids_named, count_detections, describe_counts, SummaryCounters
+from detection_store import DETECTIONS_DIR, DetectionWriter, clear_detection_store
 import requests
-import base64
+
+# OPENAI_API_URL lets runs point at another endpoint (e.g. the stub in benchmark_reviewer.py)
+API_URL = os.getenv('OPENAI_API_URL', "https://api.openai.com/v1/chat/completions")
+VISION_MODEL = "gpt-4-vision-preview"
+DESCRIPTION_PROMPT = "Describe this image, with particular attention to any people and their approximate distance from the camera. If you see people, explicitly state whether they are within a few meters of the camera."
 
 def select_directory(prompt):
     root = tk.Tk()
@@ -29,7 +39,7 @@ def analyze_images(image_paths, api_key):
                 {
                     "role": "user",
                     "content": [
-                        {"type": "text", "text": "Describe this image, with particular attention to any people and their approximate distance from the camera. If you see people, explicitly state whether they are within a few meters of the camera."},
+                        {"type": "text", "text": DESCRIPTION_PROMPT},
                         {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}}
                     ]
                 }
@@ -50,23 +60,62 @@ def make_api_call(messages, api_key):
         "Authorization": f"Bearer {api_key}"
     }
     payload = {
-        "model": "gpt-4-vision-preview",
+        "model": VISION_MODEL,
         "messages": messages,
         "max_tokens": 500
     }
     response = requests.post(
-        "https://api.openai.com/v1/chat/completions",
+        API_URL,
         headers=headers,
         json=payload
     )
     return response.json()
 
-def encode_image(image_path):
-    with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode('utf-8')
+# Group runs of near-identical consecutive frames and analyse one representative per group.
+# Off by default: every member is counted with its representative's people count, so a worker
+# too small to change the hash would be miscounted. Only for fixed cameras with static scenes.
+DEDUPE_FRAMES = False
+DEDUPE_MAX_DISTANCE = 2  # Max differing hash bits (out of 256) for two frames to count as the same shot
+
+# Streaming mode keeps only running counters in memory (per-image rows are in image_results.csv either way),
+# flushing summary_statistics.csv and both pie charts every CHECKPOINT_EVERY images (for very large folders)
+STREAMING_AGGREGATION = False
+CHECKPOINT_EVERY = 500
+
+# Reuse detections (and vision descriptions) stored by earlier runs, so only new or changed images are analysed
+USE_RESULT_CACHE = True
+DETECTOR_MODEL = 'yolov8n.pt'
+
+# CPU inference backend: 'torch', or an exported and cached 'onnx' / 'openvino' graph (see benchmark_backends.py)
+DETECTOR_BACKEND = 'torch'
+DETECTOR_INT8 = False  # Quantized graph - onnx and openvino backends only
+
+# Video and time-lapse files in the image folder are sampled every VIDEO_FRAME_INTERVAL seconds
+# (or every VIDEO_FRAME_STRIDE frames, if set) and decoded on the fly - no frames are written to disk
+VIDEO_FRAME_INTERVAL = 5.0
+VIDEO_FRAME_STRIDE = None
+
+# Tiled detection finds small, distant people in high-resolution photos (slower - see tiled_detection.py)
+TILED_DETECTION = False
+TILE_SIZE = 640
+TILE_OVERLAP = 0.2
+
+# Cascade mode runs DETECTOR_MODEL on every image and re-runs only images with uncertain
+# person detections through CASCADE_LARGE_MODEL (see detector_cascade.py)
+DETECTOR_CASCADE = False
+CASCADE_LARGE_MODEL = 'yolov8m.pt'
+
+# Save every box, class and confidence to OUTPUT/detections/ so the statistics can be re-sliced
+# later (e.g. a confidence threshold or the lower third of the frame) with slice_detections.py
+STORE_DETECTIONS = True
 
 # Initialize YOLO model
-model = YOLO('yolov8n.pt')  # Load YOLOv8 nano model
+model = load_detector(DETECTOR_MODEL, DETECTOR_BACKEND, DETECTOR_INT8)  # Load YOLOv8 nano model
+cache = ResultCache() if USE_RESULT_CACHE else None
+detect_fn, detector_key = build_detector(
+    model, DETECTOR_MODEL, DETECTOR_BACKEND, DETECTOR_INT8, TILE_SIZE if TILED_DETECTION else None, TILE_OVERLAP,
+    CASCADE_LARGE_MODEL if DETECTOR_CASCADE else None
+)
 
 # Get API key from environment variable or user input
 api_key = os.getenv('OPENAI_API_KEY')
@@ -91,14 +140,28 @@ else:
 if not categories_file:
     raise ValueError("No categories file selected")
 
-# Read categories
-with open(categories_file, 'r') as f:
-    categories = [line.strip() for line in f.readlines()]
+# Read categories and resolve them once against the model's classes
+categories = read_categories(categories_file)
+category_lookup = build_category_lookup(model.names, categories)  # class id -> category index (-1 if none)
+person_class_ids = class_ids_named(model.names, 'person')
+
+# Try to find specific output directory first, fall back to user selection if not found
+default_save_dir = "/Users/nathankirchner/Workstuff/Projects/GWA_Reviewer/OUTPUT"
+if os.path.exists(default_save_dir):
+    save_dir = default_save_dir
+else:
+    save_dir = select_directory("Folder 'OUTPUT' not found. Please select directory to save results")
+if not save_dir:
+    raise ValueError("No save directory selected")
 
 # Initialize counters
-category_counts = {category: 0 for category in categories}
-total_images = 0
-person_count_distribution = {0: 0}  # Initialize with 0 people count
+counters = SummaryCounters(categories)
+
+# Columnar store of all detections from this run
+if STORE_DETECTIONS:
+    detection_dir = os.path.join(save_dir, DETECTIONS_DIR)
+    clear_detection_store(detection_dir)
+    detection_writer = DetectionWriter(detection_dir, model.names)
 
 # Initialize before the image processing loop
 image_data_list = []
@@ -106,120 +169,120 @@ image_data_list = []
 # Initialize list to store images with nearby people
 images_with_nearby_people = []
 
-# Analyze images
-for filename in os.listdir(image_dir):
-    if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-        image_path = os.path.join(image_dir, filename)
-        try:
-            # Analyze image
-            print(f"Analysing {filename}")
-            results = model(image_path)[0]  # Get results for first image
-            detected_classes = results.boxes.cls  # Get class indices
-            class_names = [results.names[int(cls)] for cls in detected_classes]  # Convert to class names
-            
-            # Count people in this image
-            people_count = class_names.count('person')
-            print(f"FOUND: {class_names} (People count: {people_count})")
-            
-            # Update person count distribution
-            if people_count in person_count_distribution:
-                person_count_distribution[people_count] += 1
-            else:
-                person_count_distribution[people_count] = 1
-
-            # Count matching categories (check all detected objects)
-            for detected_class in class_names:
-                for category in categories:
-                    if category.lower() in detected_class.lower():
-                        category_counts[category] += 1
-                        break
-
-            # Add image data to list
-            image_data = {
-                'elements': class_names,
-                'size': os.path.getsize(image_path),
-                'anomalies': []  # Add anomalies if you detect any
-            }
-            image_data_list.append(image_data)
-            
-            total_images += 1
-
-            # GPT-4 Vision Analysis with specific prompt about people's proximity
-            base64_image = encode_image(image_path)
-            messages = [
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": "Describe this image, with particular attention to any people and their approximate distance from the camera. If you see people, explicitly state whether they are within a few meters of the camera."},
-                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}}
-                    ]
-                }
-            ]
-            
-            gpt_analysis = analyze_images([image_path], api_key)[0]
-            description = gpt_analysis['analysis']
-            
-            # Check if description indicates people nearby
-            nearby_indicators = ['within a few meters', 'close to camera', 'nearby', 'close-up', 'foreground']
-            if any(indicator in description.lower() for indicator in nearby_indicators):
-                images_with_nearby_people.append(filename)
-        except Exception as e:
-            print(f"Error processing {filename}: {str(e)}")
+# Vision descriptions of each analysed frame, and which representative each duplicate frame maps to
+image_descriptions = {}
+duplicate_of = {}
 
-# Create first pie chart (original categories)
-plt.figure(figsize=(10, 8))
-labels = [f"{cat} ({count})" for cat, count in category_counts.items() if count > 0]
-values = [count for count in category_counts.values() if count > 0]
-plt.pie(values, labels=labels, autopct='%1.1f%%')
-plt.title('Image Category Distribution')
+# Per-image results (people, nearby flag, description) go straight to image_results.csv in both modes -
+# report_generator.py builds its image pages from it. Streaming mode keeps nothing else per image.
+image_rows_file = open(os.path.join(save_dir, 'image_results.csv'), 'w', newline='', encoding='utf-8')
+image_rows = csv.writer(image_rows_file)
+image_rows.writerow(['Filename', 'Size', 'People', 'Elements', 'Near People', 'Near-identical to', 'Description'])
 
-# Try to find specific output directory first, fall back to user selection if not found
-default_save_dir = "/Users/nathankirchner/Workstuff/Projects/GWA_Reviewer/OUTPUT"
-if os.path.exists(default_save_dir):
-    save_dir = default_save_dir
+# Collect images and sampled video frames, grouping near-identical frames so each group is only analysed once
+if STREAMING_AGGREGATION:
+    # Walk the directory lazily - it may hold millions of files
+    image_paths = iter_image_sources(image_dir, VIDEO_FRAME_STRIDE, VIDEO_FRAME_INTERVAL, sort=False)
 else:
-    save_dir = select_directory("Folder 'OUTPUT' not found. Please select directory to save results")
-if not save_dir:
-    raise ValueError("No save directory selected")
+    image_paths = list(iter_image_sources(image_dir, VIDEO_FRAME_STRIDE, VIDEO_FRAME_INTERVAL))
+hash_fn = cache.perceptual_hash if cache else perceptual_hash
+if DEDUPE_FRAMES and STREAMING_AGGREGATION:
+    frame_groups = iter_near_duplicate_groups(image_paths, DEDUPE_MAX_DISTANCE, hash_fn)
+elif DEDUPE_FRAMES:
+    frame_groups = group_near_duplicates(image_paths, DEDUPE_MAX_DISTANCE, hash_fn)
+    print(f"Grouped {len(image_paths)} images into {len(frame_groups)} groups of near-identical frames")
+else:
+    frame_groups = ([image_path] for image_path in image_paths)
 
-# Save first pie chart
-chart_path = os.path.join(save_dir, 'category_distribution_pie_chart.png')
-plt.savefig(chart_path)
-plt.close()
-
-# Create second pie chart (person count distribution)
-plt.figure(figsize=(10, 8))
-person_labels = [f"{count} people ({freq})" for count, freq in person_count_distribution.items()]
-person_values = list(person_count_distribution.values())
-plt.pie(person_values, labels=person_labels, autopct='%1.1f%%')
-plt.title('People Count Distribution')
-
-# Save second pie chart
-person_chart_path = os.path.join(save_dir, 'person_count_distribution_pie_chart.png')
-plt.savefig(person_chart_path)
-plt.close()
-
-# Save CSV with both distributions
-csv_path = os.path.join(save_dir, 'summary_statistics.csv')
-with open(csv_path, 'w', newline='') as f:
-    writer = csv.writer(f)
-    # First section: Category distribution
-    writer.writerow(['Category Distribution'])
-    writer.writerow(['Category', 'Count', 'Percentage'])
-    for category, count in category_counts.items():
-        percentage = (count / total_images * 100) if total_images > 0 else 0
-        writer.writerow([category, count, f"{percentage:.1f}%"])
-    
-    # Add spacing between sections
-    writer.writerow([])
-    writer.writerow([])
-    
-    # Second section: Person count distribution
-    writer.writerow(['Person Count Distribution'])
-    writer.writerow(['Number of People', 'Number of Images', 'Percentage'])
-    for person_count, frequency in person_count_distribution.items():
-        percentage = (frequency / total_images * 100) if total_images > 0 else 0
-        writer.writerow([person_count, frequency, f"{percentage:.1f}%"])
+# Analyze images
+run_start = time.perf_counter()
+images_since_checkpoint = 0
+for group in frame_groups:
+    filename = source_name(group[0])
+    group_size = len(group)
+    try:
+        # Analyze image
+        image_path, detections, content_hash, cached = detect_group(group, detect_fn, detector_key, cache)
+        print(f"Analysed {filename}{' (cached)' if cached else ''}")
+        if STORE_DETECTIONS:
+            detection_writer.add(filename, detections, weight=group_size)
+        detected_classes = detections['cls']  # Get class indices
+        class_counts, image_category_counts = count_detections(detected_classes, category_lookup, len(categories))
+        found = describe_counts(class_counts, model.names)
+        
+        # Count people in this image
+        people_count = int(class_counts[person_class_ids].sum())
+        print(f"FOUND: {found} (People count: {people_count})")
+
+        # Update person count and category distributions (each detected object counts towards its first matching category)
+        counters.add(people_count, image_category_counts, weight=group_size)
+
+        # GPT-4 Vision Analysis with specific prompt about people's proximity
+        description = cache.get_response(content_hash, VISION_MODEL, DESCRIPTION_PROMPT) if cache else None
+        if description is None:
+            gpt_analysis = analyze_images([image_path], api_key)
+            if gpt_analysis:
+                description = gpt_analysis[0]['analysis']
+                if cache:
+                    cache.put_response(content_hash, VISION_MODEL, DESCRIPTION_PROMPT, description)
+            else:
+                # The call failed (already reported) - keep the image's row and counts, without a description
+                description = ''
+        
+        # Check if description indicates people nearby
+        nearby_indicators = ['within a few meters', 'close to camera', 'nearby', 'close-up', 'foreground']
+        people_nearby = any(indicator in description.lower() for indicator in nearby_indicators)
+
+        for member_path in group:
+            member_name = source_name(member_path)
+            image_rows.writerow([
+                member_name, source_size(member_path), people_count, ' '.join(found),
+                'yes' if people_nearby else 'no',
+                filename if member_name != filename else '',
+                description if member_name == filename else ''
+            ])
+        if not STREAMING_AGGREGATION:
+            # Add image data to list (one entry per group member)
+            for member_path in group:
+                image_data = {
+                    'elements': list(found),
+                    'size': source_size(member_path),
+                    'anomalies': []  # Add anomalies if you detect any
+                }
+                image_data_list.append(image_data)
+
+            if people_nearby:
+                images_with_nearby_people.extend(source_name(member_path) for member_path in group)
+
+            # Keep the description so it isn't requested again for the summary below
+            image_descriptions[filename] = description
+            for member_path in group[1:]:
+                duplicate_of[source_name(member_path)] = filename
+    except Exception as e:
+        print(f"Error processing {filename}: {str(e)}")
+
+    # Periodically flush partial results so they can be inspected mid-run
+    images_since_checkpoint += group_size
+    if STREAMING_AGGREGATION and images_since_checkpoint >= CHECKPOINT_EVERY:
+        image_rows_file.flush()
+        counters.write_outputs(save_dir)
+        if STORE_DETECTIONS:
+            detection_writer.flush()
+        print(f"Checkpoint: {counters.total_images} images summarised so far")
+        images_since_checkpoint = 0
+
+image_rows_file.close()
+if STORE_DETECTIONS:
+    detection_writer.close()
+
+# Report the end-to-end throughput, and how much of the work the cascade escalated
+run_seconds = time.perf_counter() - run_start
+print(f"\nAnalysed {counters.total_images} images in {run_seconds:.1f}s ({counters.total_images / run_seconds if run_seconds else 0:.2f} images/s end-to-end)")
+if DETECTOR_CASCADE:
+    print(detect_fn.summary())
+
+# Save both pie charts and the CSV with both distributions
+chart_path, person_chart_path = counters.write_outputs(save_dir)
 
 # Open both pie charts with default viewer
 if os.name == 'nt':  # Windows
@@ -283,25 +346,24 @@ else:  # macOS and Linux
 # print("\n" + "="*40)
 
 # After all images are processed, print the results
-print("\n=== Images with People Near Camera ===")
-if images_with_nearby_people:
-    for image in images_with_nearby_people:
-        print(f"- {image}")
-else:
-    print("No images found with people close to the camera")
-
-# After all images are processed
-print("\n=== GPT-4 Vision Descriptions ===")
-print("="*40)
-for filename in os.listdir(image_dir):
-    if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-        image_path = os.path.join(image_dir, filename)
-        try:
-            gpt_analysis = analyze_images([image_path], api_key)[0]
-            print(f"\nFile: {filename}")
-            print("-"*40)
-            print(gpt_analysis['analysis'])
-            print("="*40)
-        except Exception as e:
-            print(f"\nError getting description for {filename}: {str(e)}")
-            print("="*40)
+print(f"\nPer-image results (people nearby, descriptions) saved to: {os.path.join(save_dir, 'image_results.csv')}")
+if not STREAMING_AGGREGATION:
+    print("\n=== Images with People Near Camera ===")
+    if images_with_nearby_people:
+        for image in images_with_nearby_people:
+            print(f"- {image}")
+    else:
+        print("No images found with people close to the camera")
+
+    # After all images are processed
+    print("\n=== GPT-4 Vision Descriptions ===")
+    print("="*40)
+    for image_path in image_paths:
+        filename = source_name(image_path)
+        representative = duplicate_of.get(filename, filename)
+        print(f"\nFile: {filename}")
+        if representative != filename:
+            print(f"(near-identical to {representative})")
+        print("-"*40)
+        print(image_descriptions.get(representative, "No description available (analysis failed)"))
+        print("="*40)
\ No newline at end of file
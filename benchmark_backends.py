@@ -0,0 +1,85 @@
+"""Compare detector backends on the same folder of images.
+
+Reports images/sec for each backend and how closely its detections agree with the
+PyTorch baseline (boxes matched by class and IoU, and images with the same person count):
+
+    python benchmark_backends.py "20250214 Raw Data IMS" --limit 100
+"""
+import time
+import argparse
+from detector_backend import load_detector
+from tiled_detection import detect_image
+from image_sources import iter_image_sources
+
+WARMUP_IMAGES = 3
+
+def box_agreement(baseline, candidate, iou_threshold=0.5):
+    """(baseline boxes matched by a same-class candidate box, total baseline boxes, total candidate boxes)"""
+    import torch
+    from torchvision.ops import box_iou
+    matched = 0
+    for cls in set(baseline['cls']):
+        base_boxes = [box for c, box in zip(baseline['cls'], baseline['xyxyn']) if c == cls]
+        cand_boxes = [box for c, box in zip(candidate['cls'], candidate['xyxyn']) if c == cls]
+        if cand_boxes:
+            iou = box_iou(torch.tensor(base_boxes), torch.tensor(cand_boxes))
+            matched += int((iou.max(dim=1).values >= iou_threshold).sum())
+    return matched, len(baseline['cls']), len(candidate['cls'])
+
+def time_backend(model, image_paths):
+    """Detections for every image and the images/sec achieved (after a short warm-up)"""
+    for image_path in image_paths[:WARMUP_IMAGES]:
+        detect_image(model, image_path)
+    detections = []
+    start = time.perf_counter()
+    for image_path in image_paths:
+        detections.append(detect_image(model, image_path))
+    elapsed = time.perf_counter() - start
+    return detections, len(image_paths) / elapsed if elapsed else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark YOLO CPU backends against the PyTorch baseline")
+    parser.add_argument('image_dir')
+    parser.add_argument('--model', default='yolov8n.pt')
+    parser.add_argument('--limit', type=int, default=100, help="Benchmark on at most this many images")
+    parser.add_argument('--backends', default='torch,onnx,onnx-int8,openvino,openvino-int8',
+                        help="Comma-separated list; append -int8 for the quantized variant")
+    args = parser.parse_args()
+
+    image_paths = list(iter_image_sources(args.image_dir))[:args.limit]
+    print(f"Benchmarking on {len(image_paths)} images from {args.image_dir}\n")
+
+    baseline_model = load_detector(args.model)
+    baseline, baseline_speed = time_backend(baseline_model, image_paths)
+    person_id = next(i for i, name in baseline_model.names.items() if name == 'person')
+    rows = [('torch', baseline_speed, 1.0, 1.0, 1.0)]
+
+    for spec in args.backends.split(','):
+        spec = spec.strip()
+        if spec == 'torch':
+            continue
+        backend, _, precision = spec.partition('-')
+        try:
+            model = load_detector(args.model, backend, int8=(precision == 'int8'))
+        except Exception as e:
+            print(f"Skipping {spec}: {str(e)}")
+            continue
+        detections, speed = time_backend(model, image_paths)
+
+        matched = base_total = cand_total = same_people = 0
+        for base, cand in zip(baseline, detections):
+            m, b, c = box_agreement(base, cand)
+            matched, base_total, cand_total = matched + m, base_total + b, cand_total + c
+            same_people += base['cls'].count(person_id) == cand['cls'].count(person_id)
+        recall = matched / base_total if base_total else 1.0
+        precision_match = matched / cand_total if cand_total else 1.0
+        rows.append((spec, speed, recall, precision_match, same_people / len(image_paths)))
+
+    print(f"\n{'Backend':<16}{'Images/s':>10}{'Speed-up':>10}{'Box recall':>12}{'Box precision':>15}{'Same people':>13}")
+    for name, speed, recall, precision_match, people in rows:
+        print(f"{name:<16}{speed:>10.2f}{speed / baseline_speed if baseline_speed else 0:>9.2f}x"
+              f"{recall:>12.1%}{precision_match:>15.1%}{people:>13.1%}")
+    print("\nAgreement is measured against the PyTorch detections (same class, IoU >= 0.5).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Benchmarks for report_generator.py.
+
+imports: cold-start import time. Each run imports the module in a fresh interpreter, so
+nothing is already loaded or cached in memory. The heavy libraries the report can use are
+timed the same way for comparison.
+
+decorations: build time and file size of a long report with the footer drawn per page
+from the logo file (as before) versus from the shared footer form.
+
+paragraphs: build time of long generated sections laid out as one Paragraph each (as
+before) versus split into bounded-size paragraphs.
+
+    python benchmark_report.py imports --runs 5
+    python benchmark_report.py decorations --pages 500
+    python benchmark_report.py paragraphs --words 10000 --sections 3
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+import subprocess
+import statistics
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+IMPORT_TARGETS = ['report_generator', 'reportlab.platypus', 'matplotlib.pyplot', 'wordcloud', 'nltk']
+
+def cold_import_seconds(module, runs=5):
+    """Import times of a module, each in a new interpreter (None if it can't be imported)"""
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    times = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-c', code], cwd=BASE_DIR, capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+    return times
+
+def slowest_imports(module, count=10):
+    """(cumulative microseconds, module name) of the slowest direct imports of module, from python -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            cwd=BASE_DIR, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, int(cumulative), name.strip()))
+
+    # The tree is printed children first, so the module's own imports come just before its line
+    children = []
+    for depth, cumulative, name in reversed(rows[:-1]):
+        if depth == 0:
+            break
+        if depth == 1:
+            children.append((cumulative, name))
+    return sorted(children, reverse=True)[:count]
+
+def benchmark_imports(runs):
+    print(f"=== Cold-start import time ({runs} runs each) ===")
+    print(f"{'Module':<22}{'Median ms':>11}{'Min ms':>10}")
+    for module in IMPORT_TARGETS:
+        times = cold_import_seconds(module, runs)
+        if times is None:
+            print(f"{module:<22}{'not installed':>21}")
+        else:
+            print(f"{module:<22}{statistics.median(times) * 1000:>11.0f}{min(times) * 1000:>10.0f}")
+
+    print("\nSlowest top-level imports of report_generator:")
+    for cumulative, name in slowest_imports('report_generator'):
+        print(f"  {cumulative / 1000:>8.1f} ms  {name}")
+
+def _legacy_footer_template():
+    """ReportTemplate with the footer drawn the old way: path check and drawImage from the file on every page"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from report_generator import ReportTemplate
+
+    class LegacyFooterTemplate(ReportTemplate):
+        def on_later_pages(self, canvas, doc):
+            logo_path = Path(self.logo_path or '')
+            if not logo_path.is_file():
+                return
+            page_width = A4[0]
+            canvas.setStrokeColor(colors.HexColor('#CCCCCC'))
+            canvas.line(inch, 0.8*inch, page_width - inch, 0.8*inch)
+            canvas.drawImage(str(logo_path), 1*inch, 0.25*inch, width=1.3*inch, height=0.4*inch)
+            canvas.setFont("Helvetica", 5)
+            canvas.setFillColor(colors.HexColor('#AAAAAA'))
+            canvas.drawCentredString(page_width / 2, 0.45*inch, "https://greywalladvisory.com")
+            canvas.drawCentredString(page_width / 2, 0.35*inch, "https://www.linkedin.com/in/nkirchner/")
+            canvas.drawRightString(page_width - inch, 0.4*inch, "202502 Kirchner")
+
+    return LegacyFooterTemplate
+
+def build_pages(template_class, output_file, pages, logo_path):
+    """Lay out a report of the given number of short pages, all with the footer; returns seconds taken"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, PageBreak
+    from report_generator import report_styles
+
+    _, heading_style, normal_style = report_styles()
+    story = []
+    for page in range(pages):
+        story.append(Paragraph(f"Image {page + 1}", heading_style))
+        story.append(Paragraph("A road works site with two workers in high-visibility vests. " * 8, normal_style))
+        story.append(PageBreak())
+    doc = template_class(str(output_file), first_template='Later', logo_path=logo_path, pagesize=A4,
+                         topMargin=inch, bottomMargin=inch, leftMargin=inch, rightMargin=inch)
+    start = time.perf_counter()
+    doc.build(story)
+    return time.perf_counter() - start
+
+def benchmark_decorations(pages):
+    from PIL import Image as PILImage
+    from report_generator import ReportTemplate, LOGO_PATH
+
+    work_dir = Path(tempfile.mkdtemp(prefix='report_benchmark_'))
+    try:
+        logo_path = LOGO_PATH
+        if not logo_path.exists():
+            # Stand-in logo at a typical export size
+            logo_path = work_dir / "logo.png"
+            PILImage.new('RGBA', (2600, 800), (240, 240, 240, 255)).save(logo_path)
+
+        print(f"=== Page decorations: {pages} pages ===")
+        print(f"{'Footer':<22}{'Build s':>9}{'ms/page':>9}{'PDF KB':>9}")
+        rows = []
+        for name, template_class in (('per page (before)', _legacy_footer_template()), ('shared form', ReportTemplate)):
+            output_file = work_dir / f"{name.split()[0]}.pdf"
+            seconds = build_pages(template_class, output_file, pages, logo_path)
+            rows.append(seconds)
+            print(f"{name:<22}{seconds:>9.2f}{seconds / pages * 1000:>9.2f}{os.path.getsize(output_file) / 1024:>9.0f}")
+        print(f"\nShared form is {rows[0] / rows[1] if rows[1] else 0:.2f}x faster")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+SAMPLE_SENTENCES = (
+    "Two workers in high-visibility vests stand beside the excavator.",
+    "The barrier on the left edge of the site is partly open.",
+    "A pedestrian crosses the road close to the camera, about three meters away.",
+    "Traffic cones mark the lane closure and the signage is clearly visible.",
+    "No one in the frame appears to be wearing a hard hat.",
+)
+
+def sample_text(words):
+    """Description-like text of roughly the given number of words, in paragraphs of a few sentences"""
+    sentences, count = [], 0
+    while count < words:
+        sentence = SAMPLE_SENTENCES[len(sentences) % len(SAMPLE_SENTENCES)]
+        sentences.append(sentence)
+        count += len(sentence.split())
+    # A paragraph break every eight sentences, as in the model's output
+    return '<br/><br/>'.join(' '.join(sentences[i:i + 8]) for i in range(0, len(sentences), 8))
+
+def benchmark_paragraphs(words, sections):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, PageBreak
+    from report_generator import ReportTemplate, report_styles, text_paragraphs, REPORT_PARAGRAPH_CHARS
+
+    _, heading_style, normal_style = report_styles()
+    text = sample_text(words)
+    work_dir = Path(tempfile.mkdtemp(prefix='report_benchmark_'))
+    try:
+        print(f"=== Long text: {sections} sections of ~{words} words ===")
+        print(f"{'Layout':<26}{'Build s':>9}{'Pages':>7}{'Flowables':>11}")
+        rows = []
+        layouts = (
+            ('one Paragraph (before)', lambda: [Paragraph(text, normal_style)]),
+            (f'split at {REPORT_PARAGRAPH_CHARS} chars', lambda: text_paragraphs(text, normal_style)),
+        )
+        for name, make_paragraphs in layouts:
+            story = []
+            start = time.perf_counter()
+            for section in range(sections):
+                story.append(Paragraph(f"Section {section + 1}", heading_style))
+                story.extend(make_paragraphs())
+                story.append(PageBreak())
+            flowables = len(story) - 2 * sections
+            doc = ReportTemplate(str(work_dir / f"{len(rows)}.pdf"), first_template='Later', pagesize=A4,
+                                 topMargin=inch, bottomMargin=inch, leftMargin=inch, rightMargin=inch)
+            doc.build(story)
+            seconds = time.perf_counter() - start
+            rows.append(seconds)
+            print(f"{name:<26}{seconds:>9.2f}{doc.page:>7}{flowables:>11}")
+        print(f"\nSplit paragraphs are {rows[0] / rows[1] if rows[1] else 0:.2f}x faster")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for report_generator.py")
+    parser.add_argument('benchmark', nargs='?', choices=('imports', 'decorations', 'paragraphs'), default='imports')
+    parser.add_argument('--runs', type=int, default=5, help="imports: fresh interpreters per module")
+    parser.add_argument('--pages', type=int, default=500, help="decorations: pages in the test report")
+    parser.add_argument('--words', type=int, default=10000, help="paragraphs: words per section")
+    parser.add_argument('--sections', type=int, default=3, help="paragraphs: long sections in the test report")
+    args = parser.parse_args()
+
+    if args.benchmark == 'imports':
+        benchmark_imports(args.runs)
+    elif args.benchmark == 'decorations':
+        benchmark_decorations(args.pages)
+    elif args.benchmark == 'paragraphs':
+        benchmark_paragraphs(args.words, args.sections)
+
+if __name__ == "__main__":
+    main()
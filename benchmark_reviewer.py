@@ -0,0 +1,185 @@
+"""Throughput benchmark for GWA_Reviewer_1.py-style runs, without real data or an API key.
+
+Generates a synthetic image folder, serves a local stand-in for the vision endpoint with a
+configurable latency, then runs the reviewer's stages over every image and reports the
+throughput of each (decode, detect, encode, vision, aggregate) plus peak resident memory:
+
+    python benchmark_reviewer.py --images 200 --resolution 4000x3000 --vision-latency 0.8
+
+The reviewers read OPENAI_API_URL, so a full script run can be pointed at the same stub
+(printed at start-up) as well.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import requests
+from PIL import Image, ImageDraw
+from image_sources import encode_image
+from tiled_detection import detections_from_results
+from detection_stats import build_category_lookup, class_ids_named, count_detections, SummaryCounters
+
+STAGES = ('decode', 'detect', 'encode', 'vision', 'aggregate')
+DEFAULT_CATEGORIES = ['person', 'car', 'truck', 'bicycle', 'motorcycle', 'bus', 'traffic light', 'stop sign']
+STUB_DESCRIPTION = "A road works site with two workers in high-visibility vests, one within a few meters of the camera."
+
+def generate_images(folder, count, width, height, duplicate_ratio=0.3, seed=0):
+    """Write synthetic site-like JPEGs; about duplicate_ratio of them are near-copies of the previous frame"""
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    previous = None
+    for index in range(count):
+        if previous is not None and rng.random() < duplicate_ratio:
+            # Near-identical frame: same scene with a little sensor noise
+            noise = np.random.default_rng(index).integers(-4, 5, previous.shape, dtype=np.int16)
+            array = np.clip(previous.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+            image = Image.fromarray(array)
+        else:
+            image = Image.new('RGB', (width, height), tuple(rng.randrange(60, 200) for _ in range(3)))
+            draw = ImageDraw.Draw(image)
+            for _ in range(rng.randrange(5, 30)):
+                x, y = rng.randrange(width), rng.randrange(height)
+                w, h = rng.randrange(width // 50, width // 5), rng.randrange(height // 50, height // 5)
+                draw.rectangle([x, y, x + w, y + h], fill=tuple(rng.randrange(256) for _ in range(3)))
+            array = np.asarray(image)
+        previous = array
+        image.save(os.path.join(folder, f"frame_{index:06d}.jpg"), quality=90)
+
+class _StubVisionHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.latency)
+        body = json.dumps({'choices': [{'message': {'content': STUB_DESCRIPTION}}]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass  # Keep the benchmark output readable
+
+def start_stub_vision_server(latency):
+    """Serve a fake /v1/chat/completions on localhost; returns (server, url)"""
+    handler = type('StubVisionHandler', (_StubVisionHandler,), {'latency': latency})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+
+def peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024  # Bytes on macOS, KB on Linux
+
+def run_pipeline(image_paths, model, api_url, save_dir, categories=DEFAULT_CATEGORIES):
+    """Run each reviewer stage over every image, returning the seconds spent per stage"""
+    timings = dict.fromkeys(STAGES, 0.0)
+    category_lookup = build_category_lookup(model.names, categories) if model else None
+    person_class_ids = class_ids_named(model.names, 'person') if model else None
+    counters = SummaryCounters(categories)
+    session = requests.Session()
+
+    for image_path in image_paths:
+        start = time.perf_counter()
+        with Image.open(image_path) as img:
+            image = np.ascontiguousarray(np.asarray(img.convert('RGB'))[:, :, ::-1])
+        timings['decode'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        detections = detections_from_results(model(image, verbose=False)[0]) if model else {'cls': []}
+        timings['detect'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        base64_image = encode_image(image_path)
+        timings['encode'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        response = session.post(api_url, json={
+            "model": "stub",
+            "messages": [{"role": "user", "content": [
+                {"type": "text", "text": "Describe this image."},
+                {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}}
+            ]}],
+            "max_tokens": 500
+        })
+        response.raise_for_status()
+        response.json()['choices'][0]['message']['content']  # Parse the reply, as the reviewer does
+        timings['vision'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        if model:
+            class_counts, image_category_counts = count_detections(detections['cls'], category_lookup, len(categories))
+            counters.add(int(class_counts[person_class_ids].sum()), image_category_counts)
+        timings['aggregate'] += time.perf_counter() - start
+
+    if model:  # Nothing was counted without detections
+        start = time.perf_counter()
+        counters.write_outputs(save_dir)
+        timings['aggregate'] += time.perf_counter() - start
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the reviewer pipeline on synthetic images")
+    parser.add_argument('--images', type=int, default=100, help="Number of synthetic images")
+    parser.add_argument('--resolution', default='4000x3000', help="WIDTHxHEIGHT of the synthetic images")
+    parser.add_argument('--duplicate-ratio', type=float, default=0.3, help="Share of near-identical frames")
+    parser.add_argument('--vision-latency', type=float, default=0.5, help="Seconds the stub endpoint waits per call")
+    parser.add_argument('--image-dir', help="Benchmark this folder instead of generating one")
+    parser.add_argument('--model', default='yolov8n.pt')
+    parser.add_argument('--no-detect', action='store_true', help="Skip YOLO (e.g. when ultralytics isn't installed)")
+    parser.add_argument('--keep', action='store_true', help="Keep the generated folder")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='gwa_benchmark_')
+    image_dir = args.image_dir or os.path.join(work_dir, 'images')
+    save_dir = os.path.join(work_dir, 'OUTPUT')
+    os.makedirs(save_dir)
+    if not args.image_dir:
+        width, height = (int(value) for value in args.resolution.lower().split('x'))
+        print(f"Generating {args.images} synthetic {width}x{height} images in {image_dir}...")
+        generate_images(image_dir, args.images, width, height, args.duplicate_ratio)
+    image_paths = sorted(
+        os.path.join(image_dir, filename) for filename in os.listdir(image_dir)
+        if filename.lower().endswith(('.png', '.jpg', '.jpeg'))
+    )
+
+    server, api_url = start_stub_vision_server(args.vision_latency)
+    print(f"Stub vision endpoint: {api_url} ({args.vision_latency}s latency)")
+
+    model = None
+    if not args.no_detect:
+        from detector_backend import load_detector
+        model = load_detector(args.model)
+
+    wall_start = time.perf_counter()
+    timings = run_pipeline(image_paths, model, api_url, save_dir)
+    wall = time.perf_counter() - wall_start
+    server.shutdown()
+
+    n = len(image_paths)
+    print(f"\n=== Reviewer pipeline: {n} images ===")
+    print(f"{'Stage':<12}{'Total s':>10}{'ms/image':>11}{'Images/s':>11}{'Share':>8}")
+    for stage in STAGES:
+        seconds = timings[stage]
+        print(f"{stage:<12}{seconds:>10.2f}{seconds / n * 1000 if n else 0:>11.1f}"
+              f"{n / seconds if seconds else float('inf'):>11.1f}{seconds / wall if wall else 0:>8.0%}")
+    print(f"{'end-to-end':<12}{wall:>10.2f}{wall / n * 1000 if n else 0:>11.1f}{n / wall if wall else 0:>11.1f}")
+    # Resident peak only - tracing Python allocations would slow every stage being timed
+    print(f"\nPeak memory: {peak_rss_mb():.0f} MB resident")
+
+    if args.keep:
+        print(f"Files kept in {work_dir}")
+    else:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
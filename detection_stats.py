@@ -0,0 +1,132 @@
+import os
+import csv
+import numpy as np
+import matplotlib.pyplot as plt
+
+def read_categories(categories_file):
+    """Read one category per line, dropping duplicates (they would never be counted twice)"""
+    with open(categories_file, 'r') as f:
+        return list(dict.fromkeys(line.strip() for line in f.readlines()))
+
+def build_category_lookup(class_names, categories):
+    """Resolve every detector class id to the index of the first category it matches, or -1.
+
+    class_names is the model's id -> name mapping (results.names / model.names). Matching is
+    the same case-insensitive substring test the reviewers always used, but it's done once per
+    class instead of once per detection.
+    """
+    lookup = np.full(max(class_names) + 1, -1, dtype=np.intp)
+    for class_id, class_name in class_names.items():
+        for index, category in enumerate(categories):
+            if category.lower() in class_name.lower():
+                lookup[class_id] = index
+                break
+    return lookup
+
+def class_ids_named(class_names, name):
+    """All class ids with the given name (normally just 'person' -> [0])"""
+    return np.array([class_id for class_id, class_name in class_names.items() if class_name == name], dtype=np.intp)
+
+def count_detections(detected_classes, category_lookup, num_categories):
+    """Per-class and per-category counts for one image's detected class ids"""
+    class_ids = np.asarray(detected_classes, dtype=np.intp)
+    class_counts = np.bincount(class_ids, minlength=len(category_lookup))
+    matched = category_lookup[class_ids]
+    category_counts = np.bincount(matched[matched >= 0], minlength=num_categories)
+    return class_counts, category_counts
+
+def describe_counts(class_counts, class_names):
+    """Readable {class name: count} of the classes present in an image"""
+    return {class_names[class_id]: int(class_counts[class_id]) for class_id in np.flatnonzero(class_counts)}
+
+class SummaryCounters:
+    """Running totals behind summary_statistics.csv and the two pie charts.
+
+    Only the counters are kept, so memory doesn't grow with the number of images, and
+    the outputs can be written at any point to show partial results.
+    """
+    def __init__(self, categories):
+        self.categories = list(categories)
+        self.category_counts = np.zeros(len(self.categories), dtype=np.int64)
+        self.person_count_distribution = {0: 0}  # Initialize with 0 people count
+        self.total_images = 0
+
+    def add(self, people_count, image_category_counts, weight=1):
+        """Count one analysed image, weighted by how many images it stands for"""
+        self.person_count_distribution[people_count] = self.person_count_distribution.get(people_count, 0) + weight
+        self.category_counts += image_category_counts * weight
+        self.total_images += weight
+
+    def merge(self, other):
+        """Add another set of counters (e.g. from a separate shard of images) into this one"""
+        self.category_counts += other.category_counts
+        for people_count, frequency in other.person_count_distribution.items():
+            self.person_count_distribution[people_count] = self.person_count_distribution.get(people_count, 0) + frequency
+        self.total_images += other.total_images
+
+    def write_csv(self, csv_path):
+        """Write summary_statistics.csv (replaced atomically, so a partial file is never seen)"""
+        temp_path = csv_path + '.tmp'
+        with open(temp_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            # First section: Category distribution
+            writer.writerow(['Category Distribution'])
+            writer.writerow(['Category', 'Count', 'Percentage'])
+            for category, count in zip(self.categories, self.category_counts):
+                percentage = (count / self.total_images * 100) if self.total_images > 0 else 0
+                writer.writerow([category, count, f"{percentage:.1f}%"])
+
+            # Add spacing between sections
+            writer.writerow([])
+            writer.writerow([])
+
+            # Second section: Person count distribution
+            writer.writerow(['Person Count Distribution'])
+            writer.writerow(['Number of People', 'Number of Images', 'Percentage'])
+            for person_count, frequency in self.person_count_distribution.items():
+                percentage = (frequency / self.total_images * 100) if self.total_images > 0 else 0
+                writer.writerow([person_count, frequency, f"{percentage:.1f}%"])
+        os.replace(temp_path, csv_path)
+        return csv_path
+
+    def write_pie_charts(self, save_dir):
+        """Write both pie charts and return (category chart path, person count chart path).
+
+        A chart with nothing counted yet (no images, or no category boxes) is drawn as an
+        empty placeholder, so checkpoints early in a run and empty slices still work.
+        """
+        # Create first pie chart (original categories)
+        labels = [f"{cat} ({count})" for cat, count in zip(self.categories, self.category_counts) if count > 0]
+        values = [count for count in self.category_counts if count > 0]
+        chart_path = _save_pie_chart(os.path.join(save_dir, 'category_distribution_pie_chart.png'),
+                                     values, labels, 'Image Category Distribution')
+
+        # Create second pie chart (person count distribution)
+        person_labels = [f"{count} people ({freq})" for count, freq in self.person_count_distribution.items()]
+        person_values = list(self.person_count_distribution.values())
+        person_chart_path = _save_pie_chart(os.path.join(save_dir, 'person_count_distribution_pie_chart.png'),
+                                            person_values, person_labels, 'People Count Distribution')
+        return chart_path, person_chart_path
+
+    def write_outputs(self, save_dir):
+        """Write summary_statistics.csv and both pie charts into save_dir"""
+        self.write_csv(os.path.join(save_dir, 'summary_statistics.csv'))
+        return self.write_pie_charts(save_dir)
+
+def _save_pie_chart(chart_path, values, labels, title):
+    plt.figure(figsize=(10, 8))
+    if sum(values) > 0:
+        plt.pie(values, labels=labels, autopct='%1.1f%%')
+    else:
+        # plt.pie raises on all-zero wedges
+        plt.text(0.5, 0.5, 'Nothing counted yet', ha='center', va='center', fontsize=16, color='grey')
+        plt.axis('off')
+    plt.title(title)
+    return _save_figure(chart_path)
+
+def _save_figure(chart_path):
+    temp_path = chart_path + '.tmp'
+    plt.savefig(temp_path, format='png')
+    plt.close()
+    os.replace(temp_path, chart_path)
+    return chart_path
@@ -0,0 +1,134 @@
+"""Every YOLO box of a run, stored as compact NumPy columns for re-slicing without re-running inference.
+
+The reviewers write chunk files (detections_*.npz) into OUTPUT/detections/. Each chunk holds
+flat per-box columns (image index, class id, confidence, normalised xyxy box) and per-image
+columns (filename, weight = number of near-identical frames the image stands for), plus the
+detector's class names. slice_detections.py loads them back and recomputes the summary
+statistics and charts with filters such as a minimum confidence or a region of the frame.
+"""
+import os
+import glob
+import json
+import numpy as np
+from detection_stats import build_category_lookup, class_ids_named, SummaryCounters
+
+DETECTIONS_DIR = "detections"
+DEFAULT_CHUNK_IMAGES = 5000
+
+def clear_detection_store(store_dir):
+    """Remove chunk files left by an earlier run, so they aren't mixed into this one"""
+    for path in glob.glob(os.path.join(store_dir, "detections*.npz")):
+        os.remove(path)
+
+class DetectionWriter:
+    """Buffers detections and writes them out as one .npz chunk every chunk_images images"""
+    def __init__(self, store_dir, class_names, prefix="detections", chunk_images=DEFAULT_CHUNK_IMAGES):
+        os.makedirs(store_dir, exist_ok=True)
+        self.store_dir = store_dir
+        self.class_names = json.dumps({int(class_id): name for class_id, name in class_names.items()})
+        self.prefix = prefix
+        self.chunk_images = chunk_images
+        self.chunks_written = 0
+        self._reset()
+
+    def _reset(self):
+        self.images, self.weights, self.box_counts = [], [], []
+        self.cls, self.conf, self.xyxyn = [], [], []
+
+    def add(self, filename, detections, weight=1):
+        """Record one analysed image's detections (the result cache's 'cls'/'conf'/'xyxyn' dict)"""
+        self.images.append(filename)
+        self.weights.append(weight)
+        self.box_counts.append(len(detections['cls']))
+        self.cls.extend(detections['cls'])
+        self.conf.extend(detections['conf'])
+        self.xyxyn.extend(detections['xyxyn'])
+        if len(self.images) >= self.chunk_images:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered images as a new chunk file"""
+        if not self.images:
+            return None
+        path = os.path.join(self.store_dir, f"{self.prefix}_{self.chunks_written:05d}.npz")
+        temp_path = path + '.tmp.npz'
+        np.savez_compressed(
+            temp_path,
+            image=np.array(self.images),
+            weight=np.array(self.weights, dtype=np.int32),
+            box_image=np.repeat(np.arange(len(self.images), dtype=np.int32), self.box_counts),
+            cls=np.array(self.cls, dtype=np.int16),
+            conf=np.array(self.conf, dtype=np.float16),  # Plenty of precision for thresholds like 0.6
+            xyxyn=np.array(self.xyxyn, dtype=np.float16).reshape(-1, 4),
+            class_names=np.array(self.class_names)
+        )
+        os.replace(temp_path, path)
+        self.chunks_written += 1
+        self._reset()
+        return path
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def load_detection_store(store_dir):
+    """All chunks of a run concatenated into one dict of arrays (box_image indexes into image/weight)"""
+    paths = sorted(glob.glob(os.path.join(store_dir, "detections*.npz")))
+    if not paths:
+        raise FileNotFoundError(f"No detection chunks in {store_dir}")
+    columns = {key: [] for key in ('image', 'weight', 'box_image', 'cls', 'conf', 'xyxyn')}
+    class_names = None
+    image_offset = 0
+    for path in paths:
+        with np.load(path) as chunk:
+            for key in ('image', 'weight', 'cls', 'conf', 'xyxyn'):
+                columns[key].append(chunk[key])
+            columns['box_image'].append(chunk['box_image'] + image_offset)
+            image_offset += len(chunk['image'])
+            class_names = {int(class_id): name for class_id, name in json.loads(str(chunk['class_names'])).items()}
+    store = {key: np.concatenate(values) for key, values in columns.items()}
+    store['xyxyn'] = store['xyxyn'].reshape(-1, 4)
+    store['class_names'] = class_names
+    return store
+
+def box_mask(store, min_conf=0.0, x_range=(0.0, 1.0), y_range=(0.0, 1.0)):
+    """Boxes with at least min_conf whose centre lies in the given fractions of the frame width/height"""
+    boxes = store['xyxyn'].astype(np.float32)
+    centre_x = (boxes[:, 0] + boxes[:, 2]) / 2
+    centre_y = (boxes[:, 1] + boxes[:, 3]) / 2
+    return (
+        (store['conf'].astype(np.float32) >= min_conf)
+        & (centre_x >= x_range[0]) & (centre_x <= x_range[1])
+        & (centre_y >= y_range[0]) & (centre_y <= y_range[1])
+    )
+
+def summarise_store(store, categories, mask=None):
+    """SummaryCounters for the stored detections (optionally only the boxes in mask), without re-running YOLO"""
+    class_names = store['class_names']
+    num_images, num_categories = len(store['image']), len(categories)
+    box_image, cls = store['box_image'], store['cls'].astype(np.intp)
+    if mask is not None:
+        box_image, cls = box_image[mask], cls[mask]
+
+    # People per image
+    is_person = np.isin(cls, class_ids_named(class_names, 'person'))
+    people = np.bincount(box_image[is_person], minlength=num_images)
+
+    # Category totals - each box counts towards its first matching category, once per image it stands for
+    category = build_category_lookup(class_names, categories)[cls]
+    matched = category >= 0
+    weights = store['weight']
+    category_counts = np.bincount(category[matched], weights=weights[box_image[matched]], minlength=num_categories)
+
+    counters = SummaryCounters(categories)
+    counters.category_counts += category_counts.astype(np.int64)
+    distribution = np.bincount(people, weights=weights)
+    for people_count in np.flatnonzero(distribution):
+        counters.person_count_distribution[int(people_count)] = int(distribution[people_count])
+    counters.total_images = int(weights.sum())
+    return counters
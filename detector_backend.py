@@ -0,0 +1,56 @@
+import os
+import shutil
+from ultralytics import YOLO
+
+# Exported graphs are built once and reused by every later run
+DEFAULT_EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "detector_exports")
+
+BACKENDS = ('torch', 'onnx', 'openvino')
+
+def backend_model_key(model_name, backend='torch', int8=False):
+    """Name of the detector for the result cache - each backend/precision gives slightly different boxes"""
+    if backend == 'torch':
+        return model_name
+    return f"{model_name}:{backend}{'-int8' if int8 else ''}"
+
+def export_detector(model_name, backend, int8=False, imgsz=640, export_dir=DEFAULT_EXPORT_DIR):
+    """Export the YOLO weights for an optimized CPU backend, or return the cached export"""
+    stem = os.path.splitext(os.path.basename(model_name))[0]
+    precision = 'int8' if int8 else 'fp32'
+    os.makedirs(export_dir, exist_ok=True)
+
+    if backend == 'onnx':
+        target = os.path.join(export_dir, f"{stem}_{imgsz}_{precision}.onnx")
+        if os.path.exists(target):
+            return target
+        fp32_target = os.path.join(export_dir, f"{stem}_{imgsz}_fp32.onnx")
+        if not os.path.exists(fp32_target):
+            print(f"Exporting {model_name} to ONNX (one-off)...")
+            # dynamic=True so batched tiles and other input sizes run on the same graph
+            exported = YOLO(model_name).export(format='onnx', imgsz=imgsz, dynamic=True)
+            shutil.move(exported, fp32_target)
+        if int8:
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            print("Quantizing ONNX graph to INT8 (one-off)...")
+            quantize_dynamic(fp32_target, target, weight_type=QuantType.QUInt8)
+        return target
+
+    if backend == 'openvino':
+        target = os.path.join(export_dir, f"{stem}_{imgsz}_{precision}_openvino_model")
+        if os.path.exists(target):
+            return target
+        print(f"Exporting {model_name} to OpenVINO{' INT8' if int8 else ''} (one-off)...")
+        # INT8 export calibrates on Ultralytics' small coco8 sample set
+        exported = YOLO(model_name).export(format='openvino', imgsz=imgsz, dynamic=True, int8=int8)
+        shutil.move(exported, target)
+        return target
+
+    raise ValueError(f"Unknown detector backend: {backend} (expected one of {', '.join(BACKENDS)})")
+
+def load_detector(model_name='yolov8n.pt', backend='torch', int8=False):
+    """YOLO model on the chosen backend - results and model.names work the same for all of them"""
+    if backend == 'torch':
+        if int8:
+            print("INT8 is only available for the onnx and openvino backends - using FP32 PyTorch")
+        return YOLO(model_name)
+    return YOLO(export_detector(model_name, backend, int8), task='detect')
@@ -0,0 +1,121 @@
+"""Detector cascade: the nano model for every image, a larger YOLO only where the nano model is unsure.
+
+The nano pass runs with a low confidence threshold so weak person candidates are visible.
+Images with a person box between CANDIDATE_CONF and ESCALATE_BELOW (a person the nano model
+half-sees) are re-run through the larger model, whose detections replace the nano ones.
+Everything else keeps the nano result, cut back to the usual threshold. Run this file
+directly to compare the cascade against both models on their own:
+
+    python detector_cascade.py "20250214 Raw Data IMS" --large yolov8m.pt --limit 100
+"""
+import time
+import argparse
+from tiled_detection import detect_image, DEFAULT_CONF, DEFAULT_TILE_OVERLAP
+
+DEFAULT_LARGE_MODEL = 'yolov8m.pt'
+CANDIDATE_CONF = 0.1  # Nano pass threshold - low enough to see the people it's unsure about
+ESCALATE_BELOW = 0.5  # A person box under this confidence sends the image to the larger model
+
+def cascade_cache_key(small_key, large_key, escalate_below=ESCALATE_BELOW, candidate_conf=CANDIDATE_CONF):
+    """Key for the result cache - cascade results differ from either model's on its own"""
+    return f"{small_key}>{large_key}@{candidate_conf}-{escalate_below}"
+
+def filter_detections(detections, min_conf):
+    """Only the boxes with at least min_conf"""
+    keep = [i for i, conf in enumerate(detections['conf']) if conf >= min_conf]
+    return {key: [detections[key][i] for i in keep] for key in ('cls', 'conf', 'xyxyn')}
+
+class DetectorCascade:
+    """Two-stage detector with the same detect() result format as detect_image.
+
+    Keeps a count of how many images were escalated, and the time spent in each stage.
+    """
+    def __init__(self, small_model, large_model, escalate_below=ESCALATE_BELOW, candidate_conf=CANDIDATE_CONF,
+                 keep_conf=DEFAULT_CONF, tile_size=None, tile_overlap=DEFAULT_TILE_OVERLAP):
+        self.small_model = small_model
+        self.large_model = large_model
+        self.names = small_model.names  # Both are COCO models, so class ids match
+        self.person_ids = {class_id for class_id, name in small_model.names.items() if name == 'person'}
+        self.escalate_below = escalate_below
+        self.candidate_conf = candidate_conf
+        self.keep_conf = keep_conf
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.images = self.escalated = 0
+        self.small_seconds = self.large_seconds = 0.0
+
+    def needs_escalation(self, detections):
+        """True if the nano model found a person it isn't confident about"""
+        return any(
+            cls in self.person_ids and conf < self.escalate_below
+            for cls, conf in zip(detections['cls'], detections['conf'])
+        )
+
+    def detect(self, image_path):
+        start = time.perf_counter()
+        detections = detect_image(self.small_model, image_path, self.tile_size, self.tile_overlap, conf=self.candidate_conf)
+        self.small_seconds += time.perf_counter() - start
+        self.images += 1
+        if not self.needs_escalation(detections):
+            return filter_detections(detections, self.keep_conf)
+
+        start = time.perf_counter()
+        detections = detect_image(self.large_model, image_path, self.tile_size, self.tile_overlap, conf=self.keep_conf)
+        self.large_seconds += time.perf_counter() - start
+        self.escalated += 1
+        return detections
+
+    __call__ = detect  # Usable wherever a detect function is expected (see detector_setup.py)
+
+    @property
+    def escalation_rate(self):
+        return self.escalated / self.images if self.images else 0.0
+
+    def summary(self):
+        """One-line report of the escalation rate and the detection throughput"""
+        seconds = self.small_seconds + self.large_seconds
+        return (f"Cascade: {self.escalated}/{self.images} images escalated ({self.escalation_rate:.1%}), "
+                f"{self.images / seconds if seconds else 0:.2f} images/s detection "
+                f"({self.small_seconds:.1f}s small model, {self.large_seconds:.1f}s large model)")
+
+def compare_cascade(small_model, large_model, image_paths, escalate_below=ESCALATE_BELOW):
+    """Run nano only, large only and the cascade over the same images and print people found and throughput"""
+    person_ids = {class_id for class_id, name in small_model.names.items() if name == 'person'}
+
+    def timed_people(detect):
+        start = time.perf_counter()
+        counts = [sum(cls in person_ids for cls in detect(image_path)['cls']) for image_path in image_paths]
+        return counts, time.perf_counter() - start
+
+    cascade = DetectorCascade(small_model, large_model, escalate_below)
+    small_counts, small_time = timed_people(lambda path: detect_image(small_model, path))
+    large_counts, large_time = timed_people(lambda path: detect_image(large_model, path))
+    cascade_counts, cascade_time = timed_people(cascade.detect)
+
+    n = len(image_paths)
+    print("\n=== Detector cascade ===")
+    print(f"Images:        {n}")
+    for name, counts, seconds in (
+        ('Small only', small_counts, small_time),
+        ('Large only', large_counts, large_time),
+        ('Cascade', cascade_counts, cascade_time),
+    ):
+        same = sum(a == b for a, b in zip(counts, large_counts))
+        print(f"{name + ':':<15}{sum(counts)} people, {n / seconds if seconds else 0:.2f} images/s, "
+              f"same person count as the large model on {same}/{n} images")
+    print(cascade.summary())
+
+if __name__ == "__main__":
+    from detector_backend import load_detector
+    from image_sources import iter_image_sources
+
+    parser = argparse.ArgumentParser(description="Compare the detector cascade against the small and large models alone")
+    parser.add_argument('image_dir')
+    parser.add_argument('--small', default='yolov8n.pt')
+    parser.add_argument('--large', default=DEFAULT_LARGE_MODEL)
+    parser.add_argument('--escalate-below', type=float, default=ESCALATE_BELOW)
+    parser.add_argument('--limit', type=int, default=100, help="Compare on at most this many images")
+    args = parser.parse_args()
+
+    paths = list(iter_image_sources(args.image_dir))[:args.limit]
+    compare_cascade(load_detector(args.small), load_detector(args.large), paths, args.escalate_below)
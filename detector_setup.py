@@ -0,0 +1,43 @@
+"""Detector setup shared by GWA_Reviewer_0.py, GWA_Reviewer_1.py and reviewer_cli.py.
+
+build_detector picks full-frame, tiled or cascade detection and the result-cache key that
+goes with it; detect_group runs it on one group of frames through the result cache. Keeping
+both here means the runners can't drift apart in what they compute or how they cache it.
+"""
+from functools import partial
+from detector_backend import load_detector, backend_model_key
+from tiled_detection import detect_image, detector_cache_key, DEFAULT_TILE_OVERLAP
+from detector_cascade import DetectorCascade, cascade_cache_key
+
+def build_detector(model, model_name, backend='torch', int8=False, tile_size=None, tile_overlap=DEFAULT_TILE_OVERLAP,
+                   cascade_model=None):
+    """(detect_fn, cache_key) for an already loaded model.
+
+    detect_fn(image_path) returns detections in the detect_image format. With cascade_model,
+    uncertain images are re-run through that larger model and detect_fn is the DetectorCascade
+    itself, so its escalation counts and summary() are available.
+    """
+    cache_key = detector_cache_key(backend_model_key(model_name, backend, int8), tile_size, tile_overlap)
+    if not cascade_model:
+        return partial(detect_image, model, tile_size=tile_size, tile_overlap=tile_overlap), cache_key
+
+    large_model = load_detector(cascade_model, backend, int8)
+    cascade = DetectorCascade(model, large_model, tile_size=tile_size, tile_overlap=tile_overlap)
+    large_key = detector_cache_key(backend_model_key(cascade_model, backend, int8), tile_size, tile_overlap)
+    return cascade, cascade_cache_key(cache_key, large_key)
+
+def detect_group(group, detect_fn, cache_key, cache=None):
+    """(representative, detections, content hash, cached) for a group of near-identical frames.
+
+    Only the representative frame is analysed - its results count once per group member.
+    Detections come from the result cache when it has them and are stored there otherwise.
+    """
+    image_path = group[0]
+    content_hash = cache.content_hash(image_path) if cache else None
+    detections = cache.get_detections(content_hash, cache_key) if cache else None
+    if detections is not None:
+        return image_path, detections, content_hash, True
+    detections = detect_fn(image_path)
+    if cache:
+        cache.put_detections(content_hash, cache_key, detections)
+    return image_path, detections, content_hash, False
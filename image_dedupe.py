@@ -0,0 +1,62 @@
+from PIL import Image
+from image_sources import VideoFrame, source_name
+
+# Frames whose hashes differ by at most this many bits (out of 256) are treated as the same shot.
+# Keep this tight: a distant worker barely changes a hash cell's average brightness, so a looser
+# threshold puts frames with different people counts in one group - and every member of a group
+# is counted with its representative's results. Dedupe is off by default in the reviewers.
+DEFAULT_HASH_SIZE = 16
+DEFAULT_MAX_DISTANCE = 2
+
+def perceptual_hash(image_path, hash_size=DEFAULT_HASH_SIZE):
+    """Difference hash (dHash) of an image or video frame, returned as an int of hash_size*hash_size bits"""
+    if isinstance(image_path, VideoFrame):
+        small = Image.fromarray(image_path.load()[:, :, ::-1]).convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+    else:
+        with Image.open(image_path) as img:
+            # Let the JPEG decoder scale down while decoding - a full 12-MP decode isn't needed for a 17x16 thumbnail
+            img.draft('L', (hash_size * 8, hash_size * 8))
+            small = img.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = list(small.getdata())
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            # One bit per horizontal gradient: is the pixel darker than its right-hand neighbour?
+            value = (value << 1) | int(pixels[offset + col] < pixels[offset + col + 1])
+    return value
+
+def hamming_distance(hash_a, hash_b):
+    """Number of differing bits between two hashes"""
+    return bin(hash_a ^ hash_b).count('1')
+
+def iter_near_duplicate_groups(image_paths, max_distance=DEFAULT_MAX_DISTANCE, hash_fn=perceptual_hash):
+    """Group runs of consecutive images whose perceptual hashes are within max_distance bits.
+
+    Yields groups (lists of paths) as each run ends. The first path of a group is its
+    representative and every other member is within max_distance of it. Only neighbouring
+    frames are grouped - the same view returning later (with different people in it) starts
+    a new group - so only the current group is ever held in memory.
+    """
+    group, group_hash = None, None
+    for image_path in image_paths:
+        try:
+            value = hash_fn(image_path)
+        except Exception as e:
+            # Unreadable images still get analysed (and reported) on their own
+            print(f"Could not hash {source_name(image_path)}: {str(e)}")
+            value = None
+
+        if group and value is not None and group_hash is not None and hamming_distance(value, group_hash) <= max_distance:
+            group.append(image_path)
+            continue
+        if group:
+            yield group
+        group, group_hash = [image_path], value
+    if group:
+        yield group
+
+def group_near_duplicates(image_paths, max_distance=DEFAULT_MAX_DISTANCE, hash_fn=perceptual_hash):
+    """List of the groups from iter_near_duplicate_groups"""
+    return list(iter_near_duplicate_groups(image_paths, max_distance, hash_fn))
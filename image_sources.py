@@ -0,0 +1,141 @@
+import os
+import base64
+import threading
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.m4v')
+
+# Default sampling for time-lapse and site video: one frame every few seconds
+DEFAULT_FRAME_INTERVAL = 5.0
+
+# Seeking restarts decoding at the previous keyframe - for short jumps forward it's cheaper to keep decoding
+MAX_FORWARD_GRAB = 300
+MAX_OPEN_VIDEOS = 4
+
+class VideoFrame:
+    """One frame of a video file, decoded on demand instead of being extracted to disk"""
+    def __init__(self, video_path, frame_index, timestamp):
+        self.video_path = video_path
+        self.frame_index = frame_index
+        self.timestamp = timestamp
+
+    @property
+    def name(self):
+        return f"{os.path.basename(self.video_path)}@{self.timestamp:.1f}s"
+
+    def load(self):
+        """Decoded frame as a BGR array (the same layout as cv2.imread)"""
+        with _readers_lock:  # Readers keep decode state, so one thread at a time
+            return _video_reader(self.video_path).read(self.frame_index)
+
+    def __repr__(self):
+        return f"VideoFrame({self.name!r})"
+
+class _VideoReader:
+    """Keeps a video open and its decode position, so frames read in order are streamed, not seeked"""
+    def __init__(self, video_path):
+        import cv2
+        self.capture = cv2.VideoCapture(video_path)
+        if not self.capture.isOpened():
+            raise IOError(f"Could not open video: {video_path}")
+        self.position = 0  # Index of the next frame grab() will return
+        self.last_index, self.last_frame = None, None
+
+    def read(self, frame_index):
+        import cv2
+        if frame_index == self.last_index:
+            return self.last_frame  # Hashing, detection and encoding often ask for the same frame in a row
+        if frame_index < self.position or frame_index - self.position > MAX_FORWARD_GRAB:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+            self.position = frame_index
+        while self.position < frame_index:
+            self.capture.grab()  # Advance without converting the skipped frames
+            self.position += 1
+        ok, frame = self.capture.read()
+        self.position += 1
+        if not ok:
+            raise IOError(f"Could not decode frame {frame_index}")
+        self.last_index, self.last_frame = frame_index, frame
+        return frame
+
+    def close(self):
+        self.capture.release()
+
+_open_readers = {}
+_readers_lock = threading.Lock()
+
+def _video_reader(video_path):
+    reader = _open_readers.pop(video_path, None)
+    if reader is None:
+        reader = _VideoReader(video_path)
+        while len(_open_readers) >= MAX_OPEN_VIDEOS:
+            _open_readers.pop(next(iter(_open_readers))).close()
+    _open_readers[video_path] = reader  # Most recently used goes last
+    return reader
+
+def iter_video_frames(video_path, frame_stride=None, frame_interval=DEFAULT_FRAME_INTERVAL):
+    """Sampled frames of a video, every frame_stride frames or every frame_interval seconds"""
+    import cv2
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        print(f"Could not open video: {os.path.basename(video_path)}")
+        return
+    fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+    frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    step = frame_stride or max(1, round(fps * frame_interval))
+    if frame_count > 0:
+        capture.release()
+        for frame_index in range(0, frame_count, step):
+            yield VideoFrame(video_path, frame_index, frame_index / fps)
+        return
+
+    # Some containers don't report a frame count - walk the video to its end instead
+    print(f"No frame count in {os.path.basename(video_path)} - scanning it for frames")
+    frame_index = 0
+    try:
+        while capture.grab():  # Advance without decoding
+            if frame_index % step == 0:
+                yield VideoFrame(video_path, frame_index, frame_index / fps)
+            frame_index += 1
+    finally:
+        capture.release()
+
+def iter_image_sources(image_dir, frame_stride=None, frame_interval=DEFAULT_FRAME_INTERVAL, sort=True):
+    """Image paths and sampled video frames from a directory, produced lazily.
+
+    With sort=False the directory is scanned with os.scandir and nothing is held in memory,
+    for folders too large to list up front.
+    """
+    if sort:
+        names = sorted(os.listdir(image_dir))
+    else:
+        names = (entry.name for entry in os.scandir(image_dir) if entry.is_file())
+    for filename in names:
+        lower = filename.lower()
+        if lower.endswith(IMAGE_EXTENSIONS):
+            yield os.path.join(image_dir, filename)
+        elif lower.endswith(VIDEO_EXTENSIONS):
+            yield from iter_video_frames(os.path.join(image_dir, filename), frame_stride, frame_interval)
+
+def source_name(source):
+    """Display name of an image path or video frame"""
+    return source.name if isinstance(source, VideoFrame) else os.path.basename(source)
+
+def source_size(source):
+    """File size of an image in bytes (None for video frames, which have no file of their own)"""
+    return None if isinstance(source, VideoFrame) else os.path.getsize(source)
+
+def detector_input(source):
+    """What to pass to YOLO: the path for image files, the decoded array for video frames"""
+    return source.load() if isinstance(source, VideoFrame) else source
+
+def encode_image(source):
+    """Base64 JPEG of an image file or video frame, for the vision API"""
+    if isinstance(source, VideoFrame):
+        import cv2
+        ok, buffer = cv2.imencode('.jpg', source.load(), [cv2.IMWRITE_JPEG_QUALITY, 90])
+        if not ok:
+            raise IOError(f"Could not encode {source.name}")
+        return base64.b64encode(buffer.tobytes()).decode('utf-8')
+    with open(source, "rb") as image_file:
+        return base64.b64encode(image_file.read()).decode('utf-8')
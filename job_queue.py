@@ -0,0 +1,107 @@
+import time
+import sqlite3
+from image_sources import VideoFrame
+
+class JobQueue:
+    """Durable queue of (image, prompt) work items with per-item status and retry counts.
+
+    Items live in SQLite, so a crashed or interrupted run picks up where it stopped.
+    Status is one of 'pending', 'running', 'done', 'failed' or 'stale' (queued by an
+    earlier run for an image that hasn't been seen again yet).
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                image_key TEXT, model TEXT, prompt TEXT,
+                path TEXT, frame_index INTEGER, timestamp REAL, filename TEXT,
+                status TEXT, attempts INTEGER DEFAULT 0, last_error TEXT, updated REAL,
+                UNIQUE (image_key, model, prompt)
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, image_key);
+        """)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def begin_run(self):
+        """Park everything unfinished from earlier runs; add() re-activates what this run still needs"""
+        self.conn.execute("UPDATE jobs SET status = 'stale' WHERE status != 'done'")
+        self.conn.commit()
+
+    def add(self, image_key, source, filename, model, prompt):
+        """Queue a prompt for an image (re-queuing it if it was left unfinished or failed before)"""
+        if isinstance(source, VideoFrame):
+            path, frame_index, timestamp = source.video_path, source.frame_index, source.timestamp
+        else:
+            path, frame_index, timestamp = source, None, None
+        self.conn.execute("""
+            INSERT INTO jobs (image_key, model, prompt, path, frame_index, timestamp, filename, status, updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 'pending', ?)
+            ON CONFLICT (image_key, model, prompt) DO UPDATE SET
+                status = 'pending',
+                attempts = CASE WHEN status = 'failed' THEN 0 ELSE attempts END,
+                path = excluded.path, frame_index = excluded.frame_index,
+                timestamp = excluded.timestamp, filename = excluded.filename, updated = excluded.updated
+        """, (image_key, model, prompt, path, frame_index, timestamp, filename, time.time()))
+
+    def commit(self):
+        self.conn.commit()
+
+    def claim_image(self):
+        """Mark all pending prompts of the next image as running and return them, or None if the queue is drained.
+
+        Returns (image_key, source, filename, [(job_id, model, prompt), ...]).
+        """
+        row = self.conn.execute("SELECT image_key FROM jobs WHERE status = 'pending' ORDER BY id LIMIT 1").fetchone()
+        if row is None:
+            return None
+        image_key = row[0]
+        jobs = self.conn.execute(
+            "SELECT id, model, prompt, path, frame_index, timestamp, filename FROM jobs "
+            "WHERE image_key = ? AND status = 'pending' ORDER BY id", (image_key,)
+        ).fetchall()
+        self.conn.executemany(
+            "UPDATE jobs SET status = 'running', updated = ? WHERE id = ?",
+            [(time.time(), job[0]) for job in jobs]
+        )
+        self.conn.commit()
+
+        _, _, _, path, frame_index, timestamp, filename = jobs[0]
+        source = path if frame_index is None else VideoFrame(path, frame_index, timestamp)
+        return image_key, source, filename, [(job[0], job[1], job[2]) for job in jobs]
+
+    def mark_done(self, job_id):
+        self.conn.execute("UPDATE jobs SET status = 'done', last_error = NULL, updated = ? WHERE id = ?",
+                          (time.time(), job_id))
+        self.conn.commit()
+
+    def mark_failed(self, job_id, error, max_attempts):
+        """Count a failed attempt; the item goes back to pending until it has used max_attempts"""
+        self.conn.execute("""
+            UPDATE jobs SET attempts = attempts + 1, last_error = ?, updated = ?,
+                status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END
+            WHERE id = ?
+        """, (str(error), time.time(), max_attempts, job_id))
+        self.conn.commit()
+
+    def outstanding(self, image_key):
+        """Number of this image's items not yet done or permanently failed"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE image_key = ? AND status IN ('pending', 'running')", (image_key,)
+        ).fetchone()[0]
+
+    def status_counts(self):
+        return dict(self.conn.execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE status != 'stale' GROUP BY status"
+        ).fetchall())
+
+    def failures(self):
+        """(filename, prompt, attempts, last error) of every permanently failed item"""
+        return self.conn.execute(
+            "SELECT filename, prompt, attempts, last_error FROM jobs WHERE status = 'failed' ORDER BY id"
+        ).fetchall()
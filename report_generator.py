@@ -1,77 +1,119 @@
 import os
+import csv
+import functools
+import importlib.util
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from pathlib import Path
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, PageBreak, Image, Spacer, Frame
+from reportlab.platypus import SimpleDocTemplate, Paragraph, PageBreak, Image, Spacer, Frame, Table, TableStyle
 from reportlab.platypus.doctemplate import PageTemplate, BaseDocTemplate, NextPageTemplate
 from reportlab.lib.units import inch
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+from reportlab.lib.utils import ImageReader
 import io
-import nltk
-from nltk.corpus import stopwords
-nltk.download('stopwords', quiet=True)
+import time
+import hashlib
+from xml.sax.saxutils import escape, unescape
+from report_stopwords import REPORT_STOPWORDS
+from report_images import prepare_image
+from report_text import find_text_file, read_report_text, split_long_text
+
+# wordcloud is imported inside create_wordcloud, so runs that don't build a word cloud
+# don't pay for it (see benchmark_report.py for the import time)
 
 # Use Path for better path handling
 BASE_DIR = Path(__file__).parent
 BASE_DIR.mkdir(parents=True, exist_ok=True)
+TEXT_DIR = BASE_DIR / "IM_TEXT_DESCRIPTION"
+LOGO_PATH = TEXT_DIR / "20250214 GWA Logo LONG WHITE LIGHT.png"
+COVER_IMAGE_PATH = TEXT_DIR / "20250217 GWA Reviewer Report Cover.png"
+LOGO_DPI = 300  # Small and sharp-edged - worth a higher resolution than the photos
+FOOTER_FORM = 'report_footer'
+
+# Directory-driven reports lay out this many image pages per chunk PDF before merging
+REPORT_CHUNK_IMAGES = 200
+REPORT_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Images are embedded at this resolution for their size on the page, not at full camera resolution
+REPORT_IMAGE_DPI = 150
+
+# Rendered report sections (cover, statistics, image chunks, closing), keyed by a hash of
+# their inputs - a rebuild only lays out the sections whose inputs changed
+REPORT_SECTION_CACHE_DIR = BASE_DIR / "OUTPUT" / "report_sections"
+REPORT_SECTION_MAX_AGE_DAYS = 30  # Cached sections no build has used for this long are deleted
+REPORT_LAYOUT_VERSION = 3  # Bump when the page layout changes, so every cached section is rebuilt
+
+# Long text (model descriptions, insights, summaries) is laid out as paragraphs of at most
+# this many characters - reportlab re-wraps a paragraph's whole remaining text every time
+# it splits it across a page, so one huge paragraph gets slow (see benchmark_report.py)
+REPORT_PARAGRAPH_CHARS = 2000
+
+# Reviewer outputs (see detection_stats.py) that a report can be built from
+REVIEWER_CHARTS = ('category_distribution_pie_chart.png', 'person_count_distribution_pie_chart.png')
+REVIEWER_IMAGE_CSVS = ('image_results.csv', 'images_descriptions.csv')
+
+# Rendered word clouds, keyed by a hash of the descriptions and settings - an unchanged
+# set of descriptions reuses the PNG instead of being counted and drawn again
+WORDCLOUD_CACHE_DIR = BASE_DIR / "OUTPUT" / "wordcloud_cache"
+WORDCLOUD_SETTINGS = {'width': 800, 'height': 400, 'background_color': 'white', 'max_words': 100}
 
 def read_text_file(filepath):
-    """Read text file or create if doesn't exist"""
-    try:
-        # Try different encodings
-        encodings = ['utf-8', 'ascii', 'iso-8859-1']
-        for encoding in encodings:
-            try:
-                text = filepath.read_text(encoding=encoding)
-                # Clean up the text while preserving intentional line breaks
-                text = text.replace('\r\n', '\n')  # Normalize line endings
-                text = text.replace('\r', '\n')    # Convert any remaining \r to \n
-                text = '\n'.join(line for line in text.split('\n') if line.strip())  # Remove empty lines
-                text = ''.join(char for char in text if ord(char) < 128)  # Remove non-ASCII chars
-                return text.strip()
-            except UnicodeDecodeError:
-                continue
-        
-        # If all encodings fail, use utf-8 with error handling
-        return filepath.read_text(encoding='utf-8', errors='replace').strip()
-        
-    except FileNotFoundError:
+    """Read a text, RTF or DOCX file (see report_text.py), or create a placeholder if none exists"""
+    source = find_text_file(filepath)
+    if source is None:
         print(f"Creating placeholder text for: {filepath.name}")
         placeholder = f"Placeholder text for {filepath.name}"
         filepath.write_text(placeholder, encoding='utf-8')
         return placeholder
+    return read_report_text(source)
+
+def word_frequencies(text_descriptions, stopwords=REPORT_STOPWORDS):
+    """Word and two-word phrase counts for the cloud - the same ones WordCloud.generate() would draw"""
+    from wordcloud import WordCloud
+
+    # Remove <br/> tags and 'image' word before counting
+    cleaned_text = [unescape(text.replace('<br/>', ' ')).replace('image', '').replace('Image', '') for text in text_descriptions]
+    # WordCloud's own tokenising, so collocations ("traffic cones"), plurals and short words match generate()
+    return WordCloud(stopwords=stopwords, **WORDCLOUD_SETTINGS).process_text(' '.join(cleaned_text))
 
 def create_wordcloud(text_descriptions):
-    """Generate wordcloud from text"""
-    # Remove <br/> tags and 'image' word before generating wordcloud
-    cleaned_text = [text.replace('<br/>', ' ').replace('image', '').replace('Image', '') for text in text_descriptions]
-    
-    # Add 'image' to stopwords
-    custom_stopwords = set(stopwords.words('english'))
-    custom_stopwords.update(['image', 'Image', 'camera', 'Camera'])
-    
-    wordcloud = WordCloud(
-        width=800,
-        height=400,
-        background_color='white',
-        stopwords=custom_stopwords,
-        max_words=100
-    ).generate(' '.join(cleaned_text))
-    
+    """Generate wordcloud PNG from the descriptions, reusing the cached image if they haven't changed"""
+    digest = hashlib.sha256()
+    digest.update(repr(('process_text', WORDCLOUD_SETTINGS, sorted(REPORT_STOPWORDS))).encode('utf-8'))
+    for text in text_descriptions:
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\0')
+    cache_path = WORDCLOUD_CACHE_DIR / f"{digest.hexdigest()}.png"
+    if cache_path.exists():
+        return io.BytesIO(cache_path.read_bytes())
+
+    from wordcloud import WordCloud
+    wordcloud = WordCloud(**WORDCLOUD_SETTINGS).generate_from_frequencies(word_frequencies(text_descriptions))
+
+    # Straight to PNG from the rendered PIL image - no matplotlib figure
     img_buf = io.BytesIO()
-    plt.figure(figsize=(10, 5))
-    plt.imshow(wordcloud, interpolation='bilinear')
-    plt.axis('off')
-    plt.savefig(img_buf, format='png', bbox_inches='tight', pad_inches=0)
-    plt.close()
+    wordcloud.to_image().save(img_buf, format='png')
+    WORDCLOUD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    temp_path = cache_path.with_suffix('.tmp')
+    temp_path.write_bytes(img_buf.getvalue())
+    temp_path.replace(cache_path)
+    img_buf.seek(0)
     return img_buf
 
+@functools.lru_cache(maxsize=None)
+def logo_image(logo_path):
+    """The footer logo, downsampled for its size and decoded once per process"""
+    return ImageReader(prepare_image(logo_path, 1.3*inch, 0.4*inch, dpi=LOGO_DPI))
+
 class ReportTemplate(BaseDocTemplate):
-    def __init__(self, filename, **kw):
+    def __init__(self, filename, first_template='First', logo_path=LOGO_PATH, **kw):
         super().__init__(filename, **kw)
+        # Page decorations are looked up once per document, not on every page
+        self.logo_path = logo_path if logo_path and Path(logo_path).exists() else None
+        self._footer_form_ready = False
         # Normal content frame
         frame = Frame(
             self.leftMargin,
@@ -90,7 +132,7 @@ class ReportTemplate(BaseDocTemplate):
         )
         
         # First page template (no footer)
-        first_template = PageTemplate(
+        first_template_obj = PageTemplate(
             id='First',
             frames=frame,
             onPage=self.on_first_page
@@ -110,7 +152,10 @@ class ReportTemplate(BaseDocTemplate):
             onPage=self.on_later_pages
         )
         
-        self.addPageTemplates([first_template, content_template, last_template])
+        # The document starts on the first template in the list - chunks of a longer report start on 'Later'
+        templates = [first_template_obj, content_template, last_template]
+        templates.sort(key=lambda template: template.id != first_template)
+        self.addPageTemplates(templates)
     
     def on_first_page(self, canvas, doc):
         pass
@@ -119,70 +164,69 @@ class ReportTemplate(BaseDocTemplate):
         pass
     
     def on_later_pages(self, canvas, doc):
-        # Add logo to footer
-        logo_path = BASE_DIR/ "IM_TEXT_DESCRIPTION" / "20250214 GWA Logo LONG WHITE LIGHT.png"
-        if logo_path.exists():
-            # Calculate position for center of page
-            page_width = A4[0]
-            logo_width = 1.3*inch
-            logo_height = 0.4*inch
-            x_position = 1*inch
-            
-            # Draw horizontal line at top of footer
-            canvas.setStrokeColor(colors.HexColor('#CCCCCC'))
-            canvas.line(
-                inch,
-                0.8*inch,
-                page_width - inch,
-                0.8*inch
-            )
-            
-            # Draw logo
-            canvas.drawImage(
-                str(logo_path),
-                x_position,
-                0.25*inch,
-                width=logo_width,
-                height=logo_height
-            )
-            
-            # Add URLs to center of footer
-            canvas.setFont("Helvetica", 5)
-            canvas.setFillColor(colors.HexColor('#AAAAAA'))
-            
-            # Calculate center position
-            center_x = page_width / 2
-            canvas.drawCentredString(
-                center_x,
-                0.45*inch,  # Top URL
-                "https://greywalladvisory.com"
-            )
-            canvas.drawCentredString(
-                center_x,
-                0.35*inch,  # Bottom URL
-                "https://www.linkedin.com/in/nkirchner/"
-            )
-            
-            # Add text to right side of footer
-            canvas.drawRightString(
-                page_width - inch,
-                0.4*inch,
-                "202502 Kirchner"
-            )
-
-def create_report():
-    # Setup document
-    output_file = BASE_DIR / "OUTPUT" / f"Report_{datetime.now().strftime('%Y%m%d')}.pdf"
-    doc = ReportTemplate(
-        str(output_file),
-        pagesize=A4,
-        topMargin=inch,
-        bottomMargin=inch,
-        leftMargin=inch,
-        rightMargin=inch
-    )
+        # The footer (logo, line, URLs and text) is built once as a form and reused on every page
+        if self.logo_path is None:
+            return
+        if not self._footer_form_ready:
+            self._build_footer_form(canvas)
+            self._footer_form_ready = True
+        canvas.doForm(FOOTER_FORM)
+
+    def _build_footer_form(self, canvas):
+        canvas.beginForm(FOOTER_FORM)
+        canvas.saveState()
+        # Calculate position for center of page
+        page_width = A4[0]
+        logo_width = 1.3*inch
+        logo_height = 0.4*inch
+        x_position = 1*inch
+        
+        # Draw horizontal line at top of footer
+        canvas.setStrokeColor(colors.HexColor('#CCCCCC'))
+        canvas.line(
+            inch,
+            0.8*inch,
+            page_width - inch,
+            0.8*inch
+        )
+        
+        # Draw logo (decoded once per process - see logo_image)
+        canvas.drawImage(
+            logo_image(str(self.logo_path)),
+            x_position,
+            0.25*inch,
+            width=logo_width,
+            height=logo_height
+        )
+        
+        # Add URLs to center of footer
+        canvas.setFont("Helvetica", 5)
+        canvas.setFillColor(colors.HexColor('#AAAAAA'))
+        
+        # Calculate center position
+        center_x = page_width / 2
+        canvas.drawCentredString(
+            center_x,
+            0.45*inch,  # Top URL
+            "https://greywalladvisory.com"
+        )
+        canvas.drawCentredString(
+            center_x,
+            0.35*inch,  # Bottom URL
+            "https://www.linkedin.com/in/nkirchner/"
+        )
+        
+        # Add text to right side of footer
+        canvas.drawRightString(
+            page_width - inch,
+            0.4*inch,
+            "202502 Kirchner"
+        )
+        canvas.restoreState()
+        canvas.endForm()
 
-    # Styles
+def report_styles():
+    """Paragraph styles shared by every part of the report"""
     styles = getSampleStyleSheet()
     title_style = ParagraphStyle(
         'CustomTitle',
@@ -198,12 +242,19 @@ def create_report():
         spaceAfter=20
     )
     normal_style = styles['Normal']
+    return title_style, heading_style, normal_style
 
-    # Content
+def text_paragraphs(text, style, max_chars=REPORT_PARAGRAPH_CHARS):
+    """Paragraphs for a piece of text, split at line breaks or sentence ends if it's long"""
+    return [Paragraph(piece, style) for piece in split_long_text(text, max_chars)]
+
+def front_matter(styles):
+    """Cover page, preamble and summaries"""
+    title_style, heading_style, normal_style = styles
     story = []
     
     # Cover page
-    cover_image_path = BASE_DIR / "IM_TEXT_DESCRIPTION" / "20250217 GWA Reviewer Report Cover.png"
+    cover_image_path = COVER_IMAGE_PATH
     if cover_image_path.exists():
         story.append(NextPageTemplate('Later'))
         # Calculate center position
@@ -211,7 +262,7 @@ def create_report():
         margin_space = (page_width - 5.8*inch) / 2
         story.append(Spacer(1, 0.5*inch))  # Top margin
         
-        cover_img_first = Image(str(cover_image_path))
+        cover_img_first = Image(prepare_image(cover_image_path, 5.8*inch, 8*inch, REPORT_IMAGE_DPI))
         cover_img_first.drawHeight = 8*inch
         cover_img_first.drawWidth = 5.8*inch
         cover_img_first.hAlign = 'CENTER'  # Center horizontally
@@ -221,39 +272,72 @@ def create_report():
     
     # First page
     story.append(Paragraph("Image Analysis Report <br/><br/> GWA Reviewer AI", title_style))
-    story.append(Paragraph(read_text_file(BASE_DIR / "IM_TEXT_DESCRIPTION" / "report preamble.txt"), normal_style))
+    story.extend(text_paragraphs(read_text_file(TEXT_DIR / "report preamble.txt"), normal_style))
     story.append(Spacer(1, 20))
     story.append(Paragraph("Executive Summary", heading_style))
-    story.append(Paragraph(read_text_file(BASE_DIR / "IM_TEXT_DESCRIPTION" / "executive summary.txt"), normal_style))
+    story.extend(text_paragraphs(read_text_file(TEXT_DIR / "executive summary.txt"), normal_style))
     story.append(Paragraph("Aggregated Summary", heading_style))
-    story.append(Paragraph(read_text_file(BASE_DIR / "IM_TEXT_DESCRIPTION" / "aggregated summary.txt"), normal_style))
+    story.extend(text_paragraphs(read_text_file(TEXT_DIR / "aggregated summary.txt"), normal_style))
     story.append(PageBreak())
+    return story
 
-    # Image analysis pages
-    text_descriptions = []
-    screenshots = [
-        "1",
-        "2"
+def image_page(title, img_path, description, styles):
+    """One analysed image with its description, on a page of its own"""
+    _, heading_style, normal_style = styles
+    img = Image(prepare_image(img_path, 6*inch, 4*inch, REPORT_IMAGE_DPI))
+    img.drawHeight = 4*inch
+    img.drawWidth = 6*inch
+    return [
+        Paragraph(title, heading_style),
+        img,
+        Spacer(1, 20),
+        *text_paragraphs(description, normal_style),
+        PageBreak()
     ]
 
-    for screenshot in screenshots:
-        img_path = BASE_DIR / "IM_TEXT_DESCRIPTION" / f"{screenshot}.png"
-        txt_path = BASE_DIR / "IM_TEXT_DESCRIPTION" / f"{screenshot}.txt"
-        
-        if img_path.exists():
-            story.append(Paragraph(screenshot, heading_style))
-            img = Image(str(img_path))
-            img.drawHeight = 4*inch
-            img.drawWidth = 6*inch
-            story.append(img)
-            
-            description = read_text_file(txt_path)
-            text_descriptions.append(description)
-            story.append(Spacer(1, 20))
-            story.append(Paragraph(description, normal_style))
-            story.append(PageBreak())
-        else:
-            print(f"Warning: Image not found: {img_path}")
+def image_pages(pairs, styles):
+    """Image pages for a run of (title, image path, description)"""
+    story = []
+    for title, img_path, description in pairs:
+        story.extend(image_page(title, img_path, description, styles))
+    return story
+
+def statistics_pages(categories, person_counts, charts, styles):
+    """Detection summary: the reviewer's category and people count tables and pie charts"""
+    _, heading_style, normal_style = styles
+    story = [Paragraph("Detection Summary", heading_style)]
+    tables = (
+        ("Category Distribution", ['Category', 'Count', 'Percentage'], categories),
+        ("Person Count Distribution", ['Number of People', 'Number of Images', 'Percentage'], person_counts),
+    )
+    for title, header, rows in tables:
+        if not rows:
+            continue
+        story.append(Paragraph(f"<b>{title}</b>", normal_style))
+        story.append(Spacer(1, 6))
+        table = Table([header] + [list(row) for row in rows], hAlign='LEFT')
+        table.setStyle(TableStyle([
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('LINEBELOW', (0, 0), (-1, 0), 0.5, colors.HexColor('#CCCCCC')),
+            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+        ]))
+        story.append(table)
+        story.append(Spacer(1, 20))
+
+    # The charts are 10x8 inch matplotlib figures
+    for chart_path in charts:
+        chart = Image(prepare_image(chart_path, 5*inch, 4*inch, REPORT_IMAGE_DPI))
+        chart.drawHeight = 4*inch
+        chart.drawWidth = 5*inch
+        story.append(chart)
+    story.append(PageBreak())
+    return story
+
+def closing_pages(text_descriptions, styles):
+    """Word cloud, insights and conclusion"""
+    _, heading_style, normal_style = styles
+    story = []
 
     # Word cloud and insights
     if text_descriptions:
@@ -268,13 +352,13 @@ def create_report():
         # Read insights from file
         story.append(Spacer(1, 20))
         story.append(Paragraph("Key Insights:", heading_style))
-        insights = read_text_file(BASE_DIR / "IM_TEXT_DESCRIPTION" / "report insights.txt")
-        story.append(Paragraph(insights, normal_style))
+        insights = read_text_file(TEXT_DIR / "report insights.txt")
+        story.extend(text_paragraphs(insights, normal_style))
         #story.append(PageBreak())
 
     # Final page
     story.append(Paragraph("Conclusion", heading_style))
-    story.append(Paragraph(read_text_file(BASE_DIR / "IM_TEXT_DESCRIPTION" / "report conclusion.txt"), normal_style))
+    story.extend(text_paragraphs(read_text_file(TEXT_DIR / "report conclusion.txt"), normal_style))
 
     # Before final cover page
     story.append(NextPageTemplate('Last'))  # Switch to last template before final cover
@@ -285,11 +369,162 @@ def create_report():
     #     cover_img_last.drawHeight = 8*inch  # Reduced from 9 to 8 inches
     #     cover_img_last.drawWidth = 6*inch   # Reduced from 7 to 6 inches
     #     story.append(cover_img_last)
+    return story
 
-    # Generate PDF
+def render_pdf(story, output_file, first_template='First'):
+    """Lay out a story into a PDF with the report's page templates"""
+    doc = ReportTemplate(
+        str(output_file),
+        first_template=first_template,
+        pagesize=A4,
+        topMargin=inch,
+        bottomMargin=inch,
+        leftMargin=inch,
+        rightMargin=inch
+    )
     doc.build(story)
-    print(f"Report generated successfully: {output_file}")
-    
+    return output_file
+
+def discover_image_pairs(source_dir=TEXT_DIR, csv_path=None):
+    """(title, image path, description) for every analysed image, produced lazily.
+
+    From the reviewer's images_descriptions.csv or image_results.csv (Filename, Description) when csv_path is given,
+    with the images looked up in source_dir; otherwise every image in source_dir that has a
+    .txt (or .rtf / .docx) description next to it.
+    """
+    if csv_path:
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if row.get('Near-identical to'):
+                    continue  # image_results.csv lists near-duplicate frames under the image they match
+                img_path = Path(source_dir) / row['Filename']
+                if img_path.exists():
+                    # Model output is plain text - escape it for reportlab's paragraph markup
+                    yield Path(row['Filename']).stem, img_path, escape(row['Description']).replace('\n', '<br/>')
+                else:
+                    print(f"Warning: Image not found: {img_path}")
+        return
+    for img_path in sorted(Path(source_dir).iterdir()):
+        if img_path.suffix.lower() not in REPORT_IMAGE_EXTENSIONS:
+            continue
+        txt_path = find_text_file(img_path.with_suffix('.txt'))  # .rtf and .docx descriptions work too
+        if txt_path is not None:
+            yield img_path.stem, img_path, read_report_text(txt_path)
+
+def read_summary_statistics(csv_path):
+    """{section title: rows} from a reviewer summary_statistics.csv"""
+    sections, rows = {}, None
+    with open(csv_path, newline='', encoding='utf-8', errors='replace') as f:
+        reader = csv.reader(f)
+        for row in reader:
+            if not row:
+                rows = None  # Blank lines separate the sections
+            elif rows is None:
+                rows = sections[row[0]] = []
+                next(reader, None)  # Column headings
+            else:
+                rows.append(tuple(row))
+    return sections
+
+def load_reviewer_results(output_dir, image_dir=TEXT_DIR):
+    """Structured report inputs from a reviewer output folder.
+
+    The category and people count tables from summary_statistics.csv, the pie charts, and
+    (title, image path, description) for every described image - from image_results.csv
+    (GWA_Reviewer_1.py) or images_descriptions.csv (GWA_Reviewer.py), with the images
+    looked up in image_dir.
+    """
+    output_dir = Path(output_dir)
+    results = {'categories': [], 'person_counts': [], 'charts': [], 'images': []}
+    summary_path = output_dir / 'summary_statistics.csv'
+    if summary_path.exists():
+        sections = read_summary_statistics(summary_path)
+        results['categories'] = sections.get('Category Distribution', [])
+        results['person_counts'] = sections.get('Person Count Distribution', [])
+    else:
+        print(f"Warning: No summary statistics in {output_dir}")
+    results['charts'] = [output_dir / name for name in REVIEWER_CHARTS if (output_dir / name).exists()]
+    for name in REVIEWER_IMAGE_CSVS:
+        if (output_dir / name).exists():
+            results['images'] = list(discover_image_pairs(image_dir, output_dir / name))
+            break
+    else:
+        raise FileNotFoundError(f"No per-image results ({' or '.join(REVIEWER_IMAGE_CSVS)}) in {output_dir}")
+    return results
+
+def file_signature(path):
+    """(path, modification time, size) - changes whenever the file does"""
+    if path is None or not Path(path).exists():
+        return (str(path), None)
+    stat = os.stat(path)
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+def section_key(name, inputs):
+    """Cache file name of a report section with the given inputs"""
+    digest = hashlib.sha256()
+    # The footer logo and image resolution are on every page, so every section depends on them
+    digest.update(repr((REPORT_LAYOUT_VERSION, REPORT_IMAGE_DPI, file_signature(LOGO_PATH), name, inputs)).encode('utf-8'))
+    return f"{name}_{digest.hexdigest()[:32]}"
+
+def report_sections(pairs, statistics=None, chunk_size=REPORT_CHUNK_IMAGES):
+    """(name, inputs, story function, args, first template) for every section of the report, in order.
+
+    The inputs are everything a section's pages are laid out from - text, descriptions and the
+    modification time and size of each file - so a changed input gives the section a new key.
+    Image pages come in chunks of chunk_size, so a changed description only invalidates its chunk.
+    """
+    front_texts = ("report preamble.txt", "executive summary.txt", "aggregated summary.txt")
+    front_inputs = [file_signature(COVER_IMAGE_PATH)] + [file_signature(find_text_file(TEXT_DIR / name)) for name in front_texts]
+    yield 'front', front_inputs, front_matter, (), 'First'
+
+    if statistics:
+        categories, person_counts, charts = statistics['categories'], statistics['person_counts'], statistics['charts']
+        inputs = (categories, person_counts, [file_signature(chart) for chart in charts])
+        yield 'statistics', inputs, statistics_pages, (categories, person_counts, charts), 'Later'
+
+    text_descriptions = []
+    chunk = []
+    for pair in pairs:
+        chunk.append(pair)
+        text_descriptions.append(pair[2])
+        if len(chunk) == chunk_size:
+            inputs = [(title, file_signature(img_path), description) for title, img_path, description in chunk]
+            yield 'images', inputs, image_pages, (chunk,), 'Later'
+            chunk = []
+    if chunk:
+        inputs = [(title, file_signature(img_path), description) for title, img_path, description in chunk]
+        yield 'images', inputs, image_pages, (chunk,), 'Later'
+
+    closing_texts = ("report insights.txt", "report conclusion.txt")
+    closing_inputs = (text_descriptions, [file_signature(find_text_file(TEXT_DIR / name)) for name in closing_texts])
+    yield 'closing', closing_inputs, closing_pages, (text_descriptions,), 'Later'
+
+def render_section(story_fn, args, first_template, cache_path):
+    """Lay out one report section into the section cache (under a temporary name, then moved into place)"""
+    temp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.tmp")
+    render_pdf(story_fn(*args, report_styles()), temp_path, first_template)
+    os.replace(temp_path, cache_path)
+    return cache_path
+
+def prune_section_cache(used_paths, max_age_days=REPORT_SECTION_MAX_AGE_DAYS):
+    """Delete cached sections no build has used for max_age_days"""
+    cutoff = time.time() - max_age_days * 86400
+    for path in REPORT_SECTION_CACHE_DIR.iterdir():
+        if path not in used_paths and path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+
+def merge_pdfs(pdf_paths, output_file):
+    """Concatenate PDFs into output_file"""
+    from pypdf import PdfWriter
+    writer = PdfWriter()
+    for pdf_path in pdf_paths:
+        writer.append(str(pdf_path))
+    with open(output_file, 'wb') as f:
+        writer.write(f)
+    writer.close()
+    return output_file
+
+def open_pdf(output_file):
     # Open the PDF
     import platform
     import subprocess
@@ -301,5 +536,113 @@ def create_report():
     elif platform.system() == 'Linux':       # Linux
         subprocess.run(['xdg-open', output_file])
 
+def build_report(sections, output_file, workers=None):
+    """Assemble a report from report_sections(), laying out only the sections that changed.
+
+    Each section is a PDF in REPORT_SECTION_CACHE_DIR named after a hash of its inputs.
+    Sections unchanged since an earlier build are reused as they are; the rest are laid out by
+    a pool of workers processes (default: one per core), only a few queued at once so memory
+    stays bounded, and everything is merged into output_file (needs pypdf).
+    """
+    # Checked before any layout work - there is no single-pass fallback, it would hold every page in memory
+    if importlib.util.find_spec('pypdf') is None:
+        raise ImportError("Building the report needs pypdf to merge its sections: pip install pypdf")
+    output_file = Path(output_file or BASE_DIR / "OUTPUT" / f"Report_{datetime.now().strftime('%Y%m%d')}.pdf")
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    REPORT_SECTION_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    part_paths = []
+    # Every section uses the same ReportTemplate and page templates, so the merged pages match
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for name, inputs, story_fn, args, first_template in sections:
+            cache_path = REPORT_SECTION_CACHE_DIR / f"{section_key(name, inputs)}.pdf"
+            part_paths.append(cache_path)
+            if cache_path in futures or cache_path.exists():
+                continue
+            # Wait for the oldest sections once enough are queued, so pending pages don't pile up in memory
+            pending = [future for future in futures.values() if not future.done()]
+            if len(pending) >= workers * 2:
+                wait(pending, return_when=FIRST_COMPLETED)
+            futures[cache_path] = executor.submit(render_section, story_fn, args, first_template, cache_path)
+        for future in futures.values():
+            future.result()
+    print(f"Laid out {len(futures)} of {len(part_paths)} report sections (the rest were unchanged)")
+
+    merge_pdfs(part_paths, output_file)
+    for path in set(part_paths):
+        os.utime(path)  # Mark as used, so pruning keeps it
+    prune_section_cache(set(part_paths))
+    print(f"Report generated successfully: {output_file}")
+    return output_file
+
+def create_report(results=None, output_file=None, chunk_size=REPORT_CHUNK_IMAGES, workers=None):
+    """Build the report from reviewer results (see load_reviewer_results), reusing unchanged sections.
+
+    Without results, the report covers the fixed screenshots in TEXT_DIR as it always has.
+    """
+    if results is not None:
+        sections = report_sections(results['images'], results, chunk_size)
+        return build_report(sections, output_file, workers)
+
+    # Setup document
+    output_file = output_file or BASE_DIR / "OUTPUT" / f"Report_{datetime.now().strftime('%Y%m%d')}.pdf"
+    styles = report_styles()
+
+    # Content
+    story = front_matter(styles)
+
+    # Image analysis pages
+    text_descriptions = []
+    screenshots = [
+        "1",
+        "2"
+    ]
+
+    for screenshot in screenshots:
+        img_path = TEXT_DIR / f"{screenshot}.png"
+        txt_path = TEXT_DIR / f"{screenshot}.txt"
+        
+        if img_path.exists():
+            description = read_text_file(txt_path)
+            text_descriptions.append(description)
+            story.extend(image_page(screenshot, img_path, description, styles))
+        else:
+            print(f"Warning: Image not found: {img_path}")
+
+    story.extend(closing_pages(text_descriptions, styles))
+
+    # Generate PDF
+    render_pdf(story, output_file)
+    print(f"Report generated successfully: {output_file}")
+    return output_file
+
+def create_directory_report(source_dir=TEXT_DIR, csv_path=None, chunk_size=REPORT_CHUNK_IMAGES, output_file=None,
+                            workers=None):
+    """Report on every discovered image/description pair, laid out chunk_size images at a time.
+
+    Built from cached sections like create_report - see build_report.
+    """
+    return build_report(report_sections(discover_image_pairs(source_dir, csv_path), chunk_size=chunk_size),
+                        output_file, workers)
+
 if __name__ == "__main__":
-    create_report()
+    parser = argparse.ArgumentParser(description="Build the GWA Reviewer PDF report")
+    parser.add_argument('--discover', action='store_true',
+                        help="Report on every image/description pair instead of the fixed screenshots")
+    parser.add_argument('--source-dir', default=str(TEXT_DIR), help="Folder of images (and .txt descriptions)")
+    parser.add_argument('--csv', help="Reviewer images_descriptions.csv to take the descriptions from")
+    parser.add_argument('--chunk-size', type=int, default=REPORT_CHUNK_IMAGES, help="Image pages laid out per chunk")
+    parser.add_argument('--workers', type=int, help="Processes rendering report parts (default: one per core)")
+    parser.add_argument('--reviewer-output', help="Reviewer output folder (summary statistics, charts, descriptions) "
+                                                  "to build the report from; images are looked up in --source-dir")
+    args = parser.parse_args()
+
+    if args.reviewer_output:
+        results = load_reviewer_results(args.reviewer_output, args.source_dir)
+        open_pdf(create_report(results, chunk_size=args.chunk_size, workers=args.workers))
+    elif args.discover or args.csv:
+        open_pdf(create_directory_report(args.source_dir, args.csv, args.chunk_size, workers=args.workers))
+    else:
+        open_pdf(create_report())
@@ -0,0 +1,165 @@
+"""Static HTML version of the image analysis report.
+
+The same sections as the PDF from report_generator.py - cover, summaries, detection
+statistics, one entry per analysed image, word cloud, insights and conclusion - written as
+index.html plus its images in one folder that can be zipped and shared. Thumbnails are
+downsampled once (through the same cache as the PDF) and load lazily as the page is
+scrolled; each links to the full-size image. Nothing is laid out into pages, so a
+thousand-image report builds in a fraction of the PDF time and opens at once.
+
+    python report_html.py --reviewer-output OUTPUT --source-dir "20250214 Raw Data IMS"
+"""
+import os
+import time
+import shutil
+import argparse
+import webbrowser
+from html import escape
+from urllib.parse import quote
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from report_images import prepare_image
+from report_generator import (
+    BASE_DIR, TEXT_DIR, COVER_IMAGE_PATH, read_text_file, create_wordcloud,
+    discover_image_pairs, load_reviewer_results
+)
+
+# Thumbnail size in pixels - the 3:2 shape of the PDF's image pages
+HTML_THUMBNAIL_SIZE = (480, 320)
+HTML_COVER_SIZE = (580, 800)
+
+HTML_STYLE = """
+body { font-family: Helvetica, Arial, sans-serif; max-width: 52em; margin: 0 auto; padding: 2em 1em; color: #222; line-height: 1.45; }
+h1 { text-align: center; font-size: 2em; }
+h2 { margin-top: 2em; }
+img { max-width: 100%; height: auto; }
+.cover { text-align: center; }
+.image { content-visibility: auto; contain-intrinsic-size: auto 30em; border-top: 1px solid #ccc; }
+.image img { background: #eee; }
+table { border-collapse: collapse; margin-bottom: 1.5em; }
+th, td { padding: 0.2em 0.8em; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+th { border-bottom: 1px solid #ccc; }
+footer { margin-top: 3em; border-top: 1px solid #ccc; font-size: 0.75em; color: #aaa; text-align: center; }
+footer a { color: #aaa; }
+"""
+
+def bundle_file(source, dest_dir, name=None):
+    """Copy a file into the bundle, unless an identical copy is already there; returns its relative URL"""
+    dest = Path(dest_dir) / (name or Path(source).name)
+    source_stat = os.stat(source)
+    if not dest.exists() or dest.stat().st_size != source_stat.st_size or dest.stat().st_mtime_ns != source_stat.st_mtime_ns:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source, dest)
+    return f"{dest.parent.name}/{quote(dest.name)}"
+
+def thumbnail(img_path, size=HTML_THUMBNAIL_SIZE):
+    """Cached downsampled copy of an image at size pixels (dpi=72 makes points and pixels the same)"""
+    return prepare_image(img_path, size[0], size[1], dpi=72)
+
+def html_text(text):
+    """Report text (paragraph markup, as for the PDF) as HTML paragraphs"""
+    return '\n'.join(f"<p>{line}</p>" for line in text.splitlines() if line.strip())
+
+def statistics_html(statistics):
+    """Detection summary tables and pie charts"""
+    parts = ['<h2>Detection Summary</h2>']
+    tables = (
+        ("Category Distribution", ['Category', 'Count', 'Percentage'], statistics['categories']),
+        ("Person Count Distribution", ['Number of People', 'Number of Images', 'Percentage'], statistics['person_counts']),
+    )
+    for title, header, rows in tables:
+        if not rows:
+            continue
+        parts.append(f"<h3>{title}</h3>\n<table>")
+        parts.append('<tr>' + ''.join(f"<th>{cell}</th>" for cell in header) + '</tr>')
+        for row in rows:
+            # Category names come from the user's categories file - plain text, not markup
+            parts.append('<tr>' + ''.join(f"<td>{escape(str(cell))}</td>" for cell in row) + '</tr>')
+        parts.append('</table>')
+    return parts
+
+def create_html_report(pairs, statistics=None, output_dir=None, workers=None):
+    """Write the report for (title, image path, description) pairs as a static HTML bundle; returns index.html.
+
+    statistics is the output of load_reviewer_results (or None to leave the tables out).
+    Thumbnails are prepared by a pool of workers processes (default: one per core).
+    """
+    start = time.perf_counter()
+    output_dir = Path(output_dir or BASE_DIR / "OUTPUT" / f"Report_{datetime.now().strftime('%Y%m%d')}_html")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    pairs = list(pairs)
+
+    # Downsampling is the slow part of a first build - spread it over the cores
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        thumbnails = list(executor.map(thumbnail, [img_path for _, img_path, _ in pairs], chunksize=16))
+
+    index_path = output_dir / "index.html"
+    temp_path = index_path.with_suffix('.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write('<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+                '<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+                f"<title>Image Analysis Report - GWA Reviewer AI</title>\n<style>{HTML_STYLE}</style>\n</head>\n<body>\n")
+
+        # Cover and summaries
+        if COVER_IMAGE_PATH.exists():
+            cover = bundle_file(thumbnail(COVER_IMAGE_PATH, HTML_COVER_SIZE), output_dir / "thumbs")
+            f.write(f'<div class="cover"><img src="{cover}" width="{HTML_COVER_SIZE[0]}" height="{HTML_COVER_SIZE[1]}" alt="Cover"></div>\n')
+        f.write("<h1>Image Analysis Report<br>GWA Reviewer AI</h1>\n")
+        f.write(html_text(read_text_file(TEXT_DIR / "report preamble.txt")) + '\n')
+        f.write("<h2>Executive Summary</h2>\n" + html_text(read_text_file(TEXT_DIR / "executive summary.txt")) + '\n')
+        f.write("<h2>Aggregated Summary</h2>\n" + html_text(read_text_file(TEXT_DIR / "aggregated summary.txt")) + '\n')
+
+        if statistics:
+            f.write('\n'.join(statistics_html(statistics)) + '\n')
+            for chart_path in statistics['charts']:
+                chart = bundle_file(chart_path, output_dir / "charts")
+                f.write(f'<p><a href="{chart}"><img src="{chart}" loading="lazy" alt="{escape(Path(chart_path).stem)}"></a></p>\n')
+
+        # One entry per image - written as we go, thumbnails only fetched when scrolled to
+        text_descriptions = []
+        width, height = HTML_THUMBNAIL_SIZE
+        for index, ((title, img_path, description), thumb_path) in enumerate(zip(pairs, thumbnails), 1):
+            text_descriptions.append(description)
+            title = escape(title)  # A file name, not markup
+            full_size = bundle_file(img_path, output_dir / "images")
+            thumb = bundle_file(thumb_path, output_dir / "thumbs", None if thumb_path != str(img_path) else f"{index:05d}_{Path(img_path).name}")
+            f.write(f'<section class="image" id="image-{index}">\n<h2>{title}</h2>\n'
+                    f'<a href="{full_size}"><img src="{thumb}" loading="lazy" decoding="async" '
+                    f'width="{width}" height="{height}" alt="{title}"></a>\n'
+                    f'<p>{description}</p>\n</section>\n')
+
+        # Word cloud, insights and conclusion
+        if text_descriptions:
+            wordcloud_path = output_dir / "charts" / "wordcloud.png"
+            wordcloud_path.parent.mkdir(parents=True, exist_ok=True)
+            wordcloud_path.write_bytes(create_wordcloud(text_descriptions).getvalue())
+            f.write('<h2>Analysis Wordcloud</h2>\n<p><img src="charts/wordcloud.png" loading="lazy" width="800" height="400" alt="Word cloud"></p>\n')
+            f.write("<h2>Key Insights</h2>\n" + html_text(read_text_file(TEXT_DIR / "report insights.txt")) + '\n')
+        f.write("<h2>Conclusion</h2>\n" + html_text(read_text_file(TEXT_DIR / "report conclusion.txt")) + '\n')
+
+        f.write('<footer>\n<p><a href="https://greywalladvisory.com">https://greywalladvisory.com</a> | '
+                '<a href="https://www.linkedin.com/in/nkirchner/">https://www.linkedin.com/in/nkirchner/</a> | '
+                '202502 Kirchner</p>\n</footer>\n</body>\n</html>\n')
+    temp_path.replace(index_path)
+
+    print(f"HTML report generated in {time.perf_counter() - start:.1f}s: {index_path} ({len(pairs)} images)")
+    return index_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the GWA Reviewer report as a static HTML bundle")
+    parser.add_argument('--source-dir', default=str(TEXT_DIR), help="Folder of images (and .txt descriptions)")
+    parser.add_argument('--csv', help="Reviewer images_descriptions.csv to take the descriptions from")
+    parser.add_argument('--reviewer-output', help="Reviewer output folder (summary statistics, charts, descriptions) "
+                                                  "to build the report from; images are looked up in --source-dir")
+    parser.add_argument('--output-dir', help="Folder for index.html and its images (default: OUTPUT/Report_<date>_html)")
+    parser.add_argument('--workers', type=int, help="Processes preparing thumbnails (default: one per core)")
+    args = parser.parse_args()
+
+    if args.reviewer_output:
+        results = load_reviewer_results(args.reviewer_output, args.source_dir)
+        index_path = create_html_report(results['images'], results, args.output_dir, args.workers)
+    else:
+        index_path = create_html_report(discover_image_pairs(args.source_dir, args.csv), None, args.output_dir, args.workers)
+    webbrowser.open(index_path.resolve().as_uri())
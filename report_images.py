@@ -0,0 +1,49 @@
+import math
+from pathlib import Path
+
+# Embedded images are resampled to this resolution for their size on the page
+DEFAULT_DPI = 150
+JPEG_QUALITY = 85
+DEFAULT_CACHE_DIR = Path(__file__).parent / "OUTPUT" / "thumbnail_cache"
+
+def prepare_image(img_path, draw_width, draw_height, dpi=DEFAULT_DPI, quality=JPEG_QUALITY, cache_dir=DEFAULT_CACHE_DIR):
+    """Path of a copy of the image downsampled to dpi for its draw size (in points) and recompressed.
+
+    Copies are cached under the source's content hash and target size, so repeat builds
+    reuse them. Images already small enough, or that can't be read, are returned unchanged.
+    """
+    from PIL import Image as PILImage
+    from result_cache import file_content_hash
+
+    width = math.ceil(draw_width / 72 * dpi)
+    height = math.ceil(draw_height / 72 * dpi)
+    digest = file_content_hash(img_path)
+    cache_dir = Path(cache_dir)
+    for suffix in ('.jpg', '.png'):
+        cached = cache_dir / f"{digest}_{width}x{height}_q{quality}{suffix}"
+        if cached.exists():
+            return str(cached)
+
+    try:
+        with PILImage.open(img_path) as img:
+            if img.width <= width and img.height <= height and img.format == 'JPEG':
+                return str(img_path)  # Nothing to gain
+            img.draft('RGB', (width, height))  # JPEGs decode straight at a reduced scale
+            has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+            img = img.convert('RGBA' if has_alpha else 'RGB')
+            # The page stretches the image to its draw size, so match that shape - but never upsample
+            img = img.resize((min(width, img.width), min(height, img.height)), PILImage.LANCZOS)
+
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            # Logos and other transparent images stay PNG; photos become JPEG
+            cached = cache_dir / f"{digest}_{width}x{height}_q{quality}{'.png' if has_alpha else '.jpg'}"
+            temp_path = cached.with_name(cached.name + '.tmp')
+            if has_alpha:
+                img.save(temp_path, format='PNG', optimize=True)
+            else:
+                img.save(temp_path, format='JPEG', quality=quality, optimize=True)
+            temp_path.replace(cached)
+            return str(cached)
+    except OSError as e:
+        print(f"Could not prepare {Path(img_path).name} for the report ({str(e)}) - embedding the original")
+        return str(img_path)
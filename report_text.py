@@ -0,0 +1,248 @@
+"""Text inputs for the report (preamble, summaries, descriptions), read once and cached.
+
+Plain text, RTF and DOCX files are supported. Each file is read in a single pass, its
+encoding detected from the bytes, and the text folded to the ASCII subset the report's
+built-in PDF fonts can show. Results are memoized by path, modification time and size.
+"""
+import re
+import codecs
+import unicodedata
+import zipfile
+from pathlib import Path
+from xml.etree import ElementTree
+
+# Looked for in this order when the requested file doesn't exist (e.g. "report preamble.rtf" for ".txt")
+TEXT_SUFFIXES = ('.txt', '.rtf', '.docx')
+
+_cache = {}
+
+# Where long text may be cut into separate paragraphs, most preferred first:
+# line breaks, then sentence ends, then any space
+_TEXT_BREAKS = (
+    re.compile(r'(?:\s*<br\s*/?>)+\s*|\s*\n\s*'),
+    re.compile(r'(?<=[.!?])\s+'),
+    re.compile(r'\s+'),
+)
+
+class _PdfSafeTable(dict):
+    """str.translate table: ASCII as is, typography and accents mapped to ASCII, anything else dropped"""
+    REPLACEMENTS = {
+        '\u2018': "'", '\u2019': "'", '\u201a': "'", '\u2032': "'",
+        '\u201c': '"', '\u201d': '"', '\u201e': '"', '\u2033': '"',
+        '\u2013': '-', '\u2014': '-', '\u2212': '-', '\u2010': '-', '\u2011': '-',
+        '\u2026': '...', '\u2022': '-', '\u00a0': ' ', '\u2002': ' ', '\u2003': ' ', '\u2009': ' ',
+        '\u2044': '/', '\u2215': '/',
+    }
+
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        if codepoint < 128:
+            value = char
+        else:
+            value = self.REPLACEMENTS.get(char)
+            if value is None:
+                # Accented letters lose their accent ("e" for "\u00e9") rather than disappearing
+                value = unicodedata.normalize('NFKD', char)
+                if '\u2044' in value:
+                    # Vulgar fractions keep their slash and a space, so "1\u00bd m" is "1 1/2 m", not "112 m"
+                    value = ' ' + value.replace('\u2044', '/')
+                value = value.encode('ascii', 'ignore').decode() or None
+        self[codepoint] = value  # Each distinct character is only looked at once
+        return value
+
+_PDF_SAFE = _PdfSafeTable()
+
+def fold_pdf_safe(text):
+    """ASCII-only text without blank lines, as the report has always used"""
+    text = text.translate(_PDF_SAFE)
+    return '\n'.join(line for line in text.splitlines() if line.strip()).strip()
+
+_TAG = re.compile(r'<(/?)([a-zA-Z]\w*)[^>]*?(/?)>')
+
+def _units(text, pattern):
+    """(text, following separator) pieces of text, split where pattern matches outside a tag"""
+    pos = 0
+    for match in pattern.finditer(text):
+        if text.rfind('<', 0, match.start()) > text.rfind('>', 0, match.start()):
+            continue  # Inside a tag, e.g. the space in <font name="...">
+        yield text[pos:match.start()], match.group()
+        pos = match.end()
+    yield text[pos:], ''
+
+def _pack(text, max_chars, level=0):
+    if len(text) <= max_chars or level == len(_TEXT_BREAKS):
+        return [text]
+    pieces = []
+    current, separator = '', ''
+    for unit, next_separator in _units(text, _TEXT_BREAKS[level]):
+        if current and len(current) + len(separator) + len(unit) > max_chars:
+            pieces.append(current)  # The separator at a cut is dropped - the new paragraph breaks the line
+            current = ''
+        if current:
+            current += separator + unit
+        elif len(unit) > max_chars:
+            split = _pack(unit, max_chars, level + 1)
+            pieces.extend(split[:-1])
+            current = split[-1]
+        else:
+            current = unit
+        separator = next_separator
+    if current:
+        pieces.append(current)
+    return pieces
+
+def _balance_tags(pieces):
+    """Close the inline tags (<b>, <i>, <font ...>) still open at the end of each piece and reopen them in the next"""
+    balanced = []
+    open_tags = []  # (name, opening tag as written)
+    for piece in pieces:
+        prefix = ''.join(tag for _, tag in open_tags)
+        for match in _TAG.finditer(piece):
+            closing, name, self_closing = match.groups()
+            if self_closing:
+                continue  # <br/>, <img .../>
+            if not closing:
+                open_tags.append((name.lower(), match.group()))
+            elif open_tags and open_tags[-1][0] == name.lower():
+                open_tags.pop()
+        suffix = ''.join(f"</{name}>" for name, _ in reversed(open_tags))
+        balanced.append(prefix + piece + suffix)
+    return balanced
+
+def split_long_text(text, max_chars):
+    """Split text into pieces of about max_chars, cut at line breaks, else sentences, else spaces.
+
+    Pieces are packed greedily, so text within the limit comes back whole. Cuts are never made
+    inside a tag or entity, and inline tags open across a cut are closed at the end of one
+    piece and reopened at the start of the next, so each piece is valid paragraph markup.
+    A single word longer than max_chars stays whole.
+    """
+    pieces = _pack(text, max_chars)
+    return _balance_tags(pieces) if len(pieces) > 1 else pieces
+
+def decode_text(data):
+    """Decode file bytes: BOM if there is one, then UTF-8, then Windows-1252"""
+    if data.startswith(codecs.BOM_UTF8):
+        return data[len(codecs.BOM_UTF8):].decode('utf-8', errors='replace')
+    if data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return data.decode('utf-16', errors='replace')
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('cp1252', errors='replace')
+
+_RTF_TOKEN = re.compile(r"\\([a-z]{1,32})(-?\d{1,10})? ?|\\'([0-9a-f]{2})|\\([^a-z])|([{}])|[\r\n]+|(.)", re.I | re.S)
+_RTF_SKIP = {
+    'fonttbl', 'colortbl', 'stylesheet', 'info', 'pict', 'header', 'footer', 'headerl', 'headerr',
+    'footerl', 'footerr', 'footnote', 'fldinst', 'themedata', 'datastore', 'xmlnstbl', 'latentstyles',
+    'listtable', 'listoverridetable', 'rsidtbl', 'generator', 'object', 'filetbl',
+}
+_RTF_CHARS = {
+    'par': '\n', 'line': '\n', 'sect': '\n\n', 'page': '\n\n', 'tab': '\t', 'emdash': '\u2014',
+    'endash': '\u2013', 'lquote': '\u2018', 'rquote': '\u2019', 'ldblquote': '\u201c',
+    'rdblquote': '\u201d', 'bullet': '\u2022', 'emspace': ' ', 'enspace': ' ', 'qmspace': ' ',
+}
+
+def rtf_to_text(rtf):
+    """Plain text of an RTF document (formatting, fonts and embedded objects dropped)"""
+    out = []
+    stack = []
+    skipping = False
+    uc_skip, pending_skip = 1, 0  # Fallback characters that follow each \uN
+    codepage = 'cp1252'
+    for match in _RTF_TOKEN.finditer(rtf):
+        word, arg, hex_code, symbol, brace, char = match.groups()
+        if brace:
+            pending_skip = 0
+            if brace == '{':
+                stack.append((uc_skip, skipping))
+            elif stack:
+                uc_skip, skipping = stack.pop()
+        elif symbol:
+            pending_skip = 0
+            if symbol == '*':
+                skipping = True  # Optional destination this reader doesn't know
+            elif not skipping:
+                if symbol in '\r\n':
+                    out.append('\n')  # A backslash before a line break is a paragraph break
+                elif symbol == '~':
+                    out.append('\u00a0')
+                elif symbol in '{}\\':
+                    out.append(symbol)
+        elif word:
+            pending_skip = 0
+            if word in _RTF_SKIP:
+                skipping = True
+            elif word == 'ansicpg' and arg:
+                codepage = f'cp{arg}'
+            elif skipping:
+                pass
+            elif word in _RTF_CHARS:
+                out.append(_RTF_CHARS[word])
+            elif word == 'uc' and arg:
+                uc_skip = int(arg)
+            elif word == 'u' and arg:
+                codepoint = int(arg)
+                out.append(chr(codepoint + 0x10000 if codepoint < 0 else codepoint))
+                pending_skip = uc_skip
+        elif hex_code:
+            if pending_skip:
+                pending_skip -= 1
+            elif not skipping:
+                out.append(bytes([int(hex_code, 16)]).decode(codepage, errors='replace'))
+        elif char:
+            if pending_skip:
+                pending_skip -= 1
+            elif not skipping:
+                out.append(char)
+    return ''.join(out)
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+def docx_to_text(path):
+    """Plain text of a .docx file, one line per paragraph"""
+    with zipfile.ZipFile(path) as docx:
+        root = ElementTree.fromstring(docx.read('word/document.xml'))
+    paragraphs = []
+    for paragraph in root.iter(f'{_W}p'):
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == f'{_W}t':
+                parts.append(node.text or '')
+            elif node.tag == f'{_W}tab':
+                parts.append('\t')
+            elif node.tag in (f'{_W}br', f'{_W}cr'):
+                parts.append('\n')
+        paragraphs.append(''.join(parts))
+    return '\n'.join(paragraphs)
+
+def find_text_file(filepath):
+    """The file itself, or a file with the same name and another supported extension, or None"""
+    filepath = Path(filepath)
+    if filepath.exists():
+        return filepath
+    for suffix in TEXT_SUFFIXES:
+        candidate = filepath.with_suffix(suffix)
+        if candidate.exists():
+            return candidate
+    return None
+
+def read_report_text(filepath):
+    """PDF-safe text of a .txt, .rtf or .docx file (memoized until the file changes)"""
+    filepath = Path(filepath)
+    stat = filepath.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _cache.get(filepath)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    suffix = filepath.suffix.lower()
+    if suffix == '.docx':
+        text = docx_to_text(filepath)
+    else:
+        text = decode_text(filepath.read_bytes())
+        if suffix == '.rtf' or text.startswith('{\\rtf'):
+            text = rtf_to_text(text)
+    text = fold_pdf_safe(text)
+    _cache[filepath] = (key, text)
+    return text
@@ -0,0 +1,131 @@
+import os
+import json
+import sqlite3
+import hashlib
+from image_dedupe import perceptual_hash as compute_perceptual_hash, DEFAULT_HASH_SIZE
+from image_sources import VideoFrame
+
+# One store shared by all the reviewer scripts in this folder
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reviewer_cache.sqlite3")
+
+def file_content_hash(file_path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ResultCache:
+    """Per-image YOLO detections and vision responses, keyed by image content hash.
+
+    Detections are stored per (content hash, detector model) and vision responses per
+    (content hash, vision model, prompt), so changing the model or the prompt text
+    invalidates exactly the results it affects.
+    """
+    def __init__(self, db_path=DEFAULT_CACHE_PATH):
+        self.db_path = db_path
+        # Several worker processes may share the store - wait for their writes rather than failing
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # Cheap per-result commits, safe if the run is killed
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY, mtime REAL, size INTEGER, content_hash TEXT
+            );
+            CREATE TABLE IF NOT EXISTS perceptual_hashes (
+                content_hash TEXT, hash_size INTEGER, phash TEXT,
+                PRIMARY KEY (content_hash, hash_size)
+            );
+            CREATE TABLE IF NOT EXISTS detections (
+                content_hash TEXT, model TEXT, cls TEXT, conf TEXT, xyxyn TEXT,
+                PRIMARY KEY (content_hash, model)
+            );
+            CREATE TABLE IF NOT EXISTS responses (
+                content_hash TEXT, model TEXT, prompt TEXT, response TEXT,
+                PRIMARY KEY (content_hash, model, prompt)
+            );
+        """)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def content_hash(self, file_path):
+        """Content hash of a file, only re-reading it when its mtime or size has changed"""
+        if isinstance(file_path, VideoFrame):
+            # A frame is identified by its video's contents plus its position in it
+            return f"{self.content_hash(file_path.video_path)}@{file_path.frame_index}"
+        stat = os.stat(file_path)
+        path = os.path.abspath(file_path)
+        row = self.conn.execute(
+            "SELECT mtime, size, content_hash FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row and row[0] == stat.st_mtime and row[1] == stat.st_size:
+            return row[2]
+
+        content_hash = file_content_hash(file_path)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+            (path, stat.st_mtime, stat.st_size, content_hash)
+        )
+        self.conn.commit()
+        return content_hash
+
+    def perceptual_hash(self, file_path):
+        """Perceptual hash of an image, computed once per distinct file content"""
+        content_hash = self.content_hash(file_path)
+        row = self.conn.execute(
+            "SELECT phash FROM perceptual_hashes WHERE content_hash = ? AND hash_size = ?",
+            (content_hash, DEFAULT_HASH_SIZE)
+        ).fetchone()
+        if row:
+            return int(row[0], 16)
+
+        value = compute_perceptual_hash(file_path, DEFAULT_HASH_SIZE)
+        # Stored as hex text - the hash doesn't fit SQLite's signed INTEGER
+        self.conn.execute(
+            "INSERT OR REPLACE INTO perceptual_hashes VALUES (?, ?, ?)", (content_hash, DEFAULT_HASH_SIZE, f"{value:x}")
+        )
+        self.conn.commit()
+        return value
+
+    def get_detections(self, content_hash, model):
+        """Cached detections as a dict of 'cls', 'conf' and 'xyxyn' lists, or None"""
+        row = self.conn.execute(
+            "SELECT cls, conf, xyxyn FROM detections WHERE content_hash = ? AND model = ?",
+            (content_hash, model)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'cls': json.loads(row[0]), 'conf': json.loads(row[1]), 'xyxyn': json.loads(row[2])}
+
+    def put_detections(self, content_hash, model, detections):
+        """Store a dict of 'cls', 'conf' and 'xyxyn' lists (see tiled_detection.detect_image)"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO detections VALUES (?, ?, ?, ?, ?)",
+            (content_hash, model, json.dumps(detections['cls']),
+             json.dumps(detections['conf']), json.dumps(detections['xyxyn']))
+        )
+        self.conn.commit()
+        return detections
+
+    def get_response(self, content_hash, model, prompt):
+        """Cached vision response text, or None"""
+        row = self.conn.execute(
+            "SELECT response FROM responses WHERE content_hash = ? AND model = ? AND prompt = ?",
+            (content_hash, model, prompt)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_response(self, content_hash, model, prompt, response):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+            (content_hash, model, prompt, response)
+        )
+        self.conn.commit()
@@ -0,0 +1,220 @@
+"""Headless, multi-process runner for the reviewer's YOLO pass.
+
+Splits an image directory into shards, runs one YOLO worker process per core and merges
+the per-shard counters into the same summary_statistics.csv and pie charts that
+GWA_Reviewer_0.py / GWA_Reviewer_1.py produce. No tkinter dialogs - every path comes
+from the command line:
+
+    python reviewer_cli.py "20250214 Raw Data IMS" --categories categories.txt --output OUTPUT
+"""
+import os
+import sys
+import time
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from image_dedupe import perceptual_hash, group_near_duplicates, DEFAULT_MAX_DISTANCE
+from result_cache import ResultCache, DEFAULT_CACHE_PATH
+from image_sources import iter_image_sources, source_name, DEFAULT_FRAME_INTERVAL
+from detector_backend import load_detector, export_detector, BACKENDS
+from tiled_detection import DEFAULT_TILE_SIZE, DEFAULT_TILE_OVERLAP
+from detector_setup import build_detector, detect_group
+from detection_stats import read_categories, build_category_lookup, class_ids_named, count_detections, SummaryCounters
+from detection_store import DETECTIONS_DIR, DetectionWriter, clear_detection_store
+
+# Per-process state, set up once by _init_worker
+_worker = {}
+
+def split_into_shards(image_paths, num_shards):
+    """Split into contiguous shards, so runs of near-identical frames stay in the same shard"""
+    num_shards = max(1, min(num_shards, len(image_paths)))
+    shard_size, remainder = divmod(len(image_paths), num_shards)
+    shards, start = [], 0
+    for index in range(num_shards):
+        end = start + shard_size + (1 if index < remainder else 0)
+        shards.append(image_paths[start:end])
+        start = end
+    return shards
+
+def _init_worker(model_name, backend, int8, categories, torch_threads, cache_path, tile_size, tile_overlap,
+                 cascade_model=None):
+    # Give each worker its share of the cores instead of letting every process grab all of them
+    import torch
+    torch.set_num_threads(torch_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Can only be set once per process
+    try:
+        import cv2
+        cv2.setNumThreads(1)
+    except ImportError:
+        pass
+
+    model = load_detector(model_name, backend, int8)
+    _worker['model'] = model
+    _worker['detect_fn'], _worker['detector_key'] = build_detector(
+        model, model_name, backend, int8, tile_size, tile_overlap, cascade_model
+    )
+    _worker['cascade'] = _worker['detect_fn'] if cascade_model else None
+    _worker['categories'] = categories
+    _worker['category_lookup'] = build_category_lookup(model.names, categories)
+    _worker['person_class_ids'] = class_ids_named(model.names, 'person')
+    _worker['cache'] = ResultCache(cache_path) if cache_path else None
+
+def run_shard(shard_paths, dedupe_distance, shard_index=0, store_dir=None):
+    """Analyse one shard in a worker process; returns its SummaryCounters, error count and cascade escalations.
+
+    With store_dir, every detection is also written to the shard's own chunk files there.
+    """
+    model = _worker['model']
+    detector_key = _worker['detector_key']
+    categories = _worker['categories']
+    cache = _worker['cache']
+    cascade = _worker['cascade']
+    counters = SummaryCounters(categories)
+
+    if dedupe_distance is None:
+        frame_groups = [[image_path] for image_path in shard_paths]
+    else:
+        hash_fn = cache.perceptual_hash if cache else perceptual_hash
+        frame_groups = group_near_duplicates(shard_paths, dedupe_distance, hash_fn)
+
+    writer = DetectionWriter(store_dir, model.names, prefix=f"detections_shard{shard_index:05d}") if store_dir else None
+    errors = 0
+    # The cascade's counts run across every shard this worker handles - report this shard's share
+    images_before, escalated_before = (cascade.images, cascade.escalated) if cascade else (0, 0)
+    for group in frame_groups:
+        try:
+            image_path, detections, _, _ = detect_group(group, _worker['detect_fn'], detector_key, cache)
+            if writer:
+                writer.add(source_name(image_path), detections, weight=len(group))
+            class_counts, image_category_counts = count_detections(
+                detections['cls'], _worker['category_lookup'], len(categories)
+            )
+            people_count = int(class_counts[_worker['person_class_ids']].sum())
+            counters.add(people_count, image_category_counts, weight=len(group))
+        except Exception as e:
+            print(f"Error processing {source_name(group[0])}: {str(e)}")
+            errors += 1
+    if writer:
+        writer.close()
+    cascade_counts = (cascade.images - images_before, cascade.escalated - escalated_before) if cascade else (0, 0)
+    return counters, errors, cascade_counts
+
+def run(image_dir, categories_file, save_dir, workers=None, shards=None, threads_per_worker=None,
+        model_name='yolov8n.pt', cache_path=DEFAULT_CACHE_PATH, dedupe_distance=None,
+        tile_size=None, tile_overlap=DEFAULT_TILE_OVERLAP, frame_stride=None, frame_interval=DEFAULT_FRAME_INTERVAL,
+        backend='torch', int8=False, store_detections=True, cascade_model=None):
+    """Run the sharded detection pass and write the summary outputs; returns the merged counters"""
+    workers = workers or os.cpu_count() or 1
+    threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+    categories = read_categories(categories_file)
+    # Video frames are listed as (video, frame index) only - each worker decodes its own frames
+    image_paths = list(iter_image_sources(image_dir, frame_stride, frame_interval))
+    # A few shards per worker keeps every core busy even when shards take uneven time
+    shard_list = split_into_shards(image_paths, shards or workers * 4)
+    os.makedirs(save_dir, exist_ok=True)
+    store_dir = os.path.join(save_dir, DETECTIONS_DIR) if store_detections else None
+    if store_dir:
+        clear_detection_store(store_dir)
+    if backend != 'torch':
+        export_detector(model_name, backend, int8)  # Export once here, not in every worker at the same time
+        if cascade_model:
+            export_detector(cascade_model, backend, int8)
+
+    print(f"{len(image_paths)} images in {len(shard_list)} shards, "
+          f"{workers} workers x {threads_per_worker} torch threads")
+    start = time.perf_counter()
+    counters = SummaryCounters(categories)
+    total_errors = cascade_images = escalated = 0
+    # spawn, not fork: torch and its thread pools don't survive a fork cleanly
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(model_name, backend, int8, categories, threads_per_worker, cache_path, tile_size, tile_overlap,
+                  cascade_model)
+    ) as executor:
+        futures = [executor.submit(run_shard, shard, dedupe_distance, index, store_dir)
+                   for index, shard in enumerate(shard_list)]
+        for done, future in enumerate(as_completed(futures), 1):
+            shard_counters, errors, (shard_cascade_images, shard_escalated) = future.result()
+            counters.merge(shard_counters)
+            total_errors += errors
+            cascade_images += shard_cascade_images
+            escalated += shard_escalated
+            # Partial results are on disk after every shard - a failed write mustn't lose the other shards
+            try:
+                counters.write_outputs(save_dir)
+            except Exception as e:
+                print(f"Error writing partial results: {str(e)}")
+            print(f"Shard {done}/{len(shard_list)} done - {counters.total_images} images summarised")
+
+    counters.write_outputs(save_dir)
+
+    elapsed = time.perf_counter() - start
+    print(f"\nAnalysed {counters.total_images} images in {elapsed:.1f}s "
+          f"({counters.total_images / elapsed if elapsed else 0:.1f} images/s), {total_errors} errors")
+    if cascade_model:
+        print(f"Cascade: {escalated}/{cascade_images} detected images escalated to {cascade_model} "
+              f"({escalated / cascade_images if cascade_images else 0:.1%})")
+    print(f"Results saved to: {save_dir}")
+    return counters
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless multi-process GWA reviewer (YOLO detection pass)")
+    parser.add_argument('image_dir', help="Directory of images (and video files) to analyse")
+    parser.add_argument('--categories', required=True, help="Categories file, one category per line")
+    parser.add_argument('--output', default=os.path.join(os.getcwd(), "OUTPUT"), help="Directory for the CSV and charts")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per core)")
+    parser.add_argument('--shards', type=int, help="Number of shards (default: 4 per worker)")
+    parser.add_argument('--threads-per-worker', type=int, help="Torch threads per worker (default: cores / workers)")
+    parser.add_argument('--model', default='yolov8n.pt', help="YOLO weights")
+    parser.add_argument('--backend', choices=BACKENDS, default='torch', help="CPU inference backend")
+    parser.add_argument('--int8', action='store_true', help="INT8-quantized graph (onnx / openvino only)")
+    parser.add_argument('--no-cache', action='store_true', help="Don't read or write the result cache")
+    parser.add_argument('--dedupe', action='store_true',
+                        help="Analyse one frame per run of near-identical consecutive frames (fixed cameras, static "
+                             "scenes only - people too small to change the hash are counted from the first frame)")
+    parser.add_argument('--dedupe-distance', type=int, default=DEFAULT_MAX_DISTANCE,
+                        help="Max differing hash bits (out of 256) for frames to count as the same shot")
+    parser.add_argument('--tiled', action='store_true', help="Tiled detection for small, distant people (slower)")
+    parser.add_argument('--tile-size', type=int, default=DEFAULT_TILE_SIZE)
+    parser.add_argument('--tile-overlap', type=float, default=DEFAULT_TILE_OVERLAP)
+    parser.add_argument('--frame-interval', type=float, default=DEFAULT_FRAME_INTERVAL,
+                        help="Seconds between sampled frames of video files")
+    parser.add_argument('--frame-stride', type=int, help="Sample every Nth video frame instead of by time")
+    parser.add_argument('--cascade-model', help="Larger YOLO weights (e.g. yolov8m.pt) for images the main model is unsure about")
+    parser.add_argument('--no-store', action='store_true',
+                        help="Don't save the boxes to OUTPUT/detections/ (see slice_detections.py)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.isdir(args.image_dir):
+        sys.exit(f"Image directory not found: {args.image_dir}")
+    if not os.path.isfile(args.categories):
+        sys.exit(f"Categories file not found: {args.categories}")
+    run(
+        args.image_dir,
+        args.categories,
+        args.output,
+        workers=args.workers,
+        shards=args.shards,
+        threads_per_worker=args.threads_per_worker,
+        model_name=args.model,
+        cache_path=None if args.no_cache else DEFAULT_CACHE_PATH,
+        dedupe_distance=args.dedupe_distance if args.dedupe else None,
+        tile_size=args.tile_size if args.tiled else None,
+        tile_overlap=args.tile_overlap,
+        frame_stride=args.frame_stride,
+        frame_interval=args.frame_interval,
+        backend=args.backend,
+        int8=args.int8,
+        store_detections=not args.no_store,
+        cascade_model=args.cascade_model
+    )
+
+if __name__ == "__main__":
+    main()
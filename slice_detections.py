@@ -0,0 +1,55 @@
+"""Recompute summary_statistics.csv and the pie charts from a run's stored detections.
+
+No YOLO involved - the boxes saved in OUTPUT/detections/ are filtered and re-counted in seconds:
+
+    python slice_detections.py OUTPUT --categories categories.txt --min-conf 0.6
+    python slice_detections.py OUTPUT --categories categories.txt --region lower-third --output OUTPUT/lower_third
+"""
+import os
+import sys
+import time
+import argparse
+from detection_stats import read_categories
+from detection_store import DETECTIONS_DIR, load_detection_store, box_mask, summarise_store
+
+# Named regions of the frame, as (x range, y range) of the box centre in fractions of the image size
+REGIONS = {
+    'all': ((0.0, 1.0), (0.0, 1.0)),
+    'upper-third': ((0.0, 1.0), (0.0, 1 / 3)),
+    'middle-third': ((0.0, 1.0), (1 / 3, 2 / 3)),
+    'lower-third': ((0.0, 1.0), (2 / 3, 1.0)),
+    'left-half': ((0.0, 0.5), (0.0, 1.0)),
+    'right-half': ((0.5, 1.0), (0.0, 1.0)),
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Re-slice stored detections into new summary statistics and charts")
+    parser.add_argument('run_dir', help="Output directory of a reviewer run (containing detections/)")
+    parser.add_argument('--categories', required=True, help="Categories file, one category per line")
+    parser.add_argument('--output', help="Where to write the CSV and charts (default: a subfolder of run_dir)")
+    parser.add_argument('--min-conf', type=float, default=0.0, help="Ignore boxes below this confidence")
+    parser.add_argument('--region', choices=REGIONS, default='all', help="Only count boxes centred in this region")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    store_dir = os.path.join(args.run_dir, DETECTIONS_DIR)
+    if not os.path.isdir(store_dir):
+        sys.exit(f"No stored detections found in {store_dir}")
+    output = args.output or os.path.join(args.run_dir, f"slice_conf{args.min_conf:g}_{args.region}")
+    os.makedirs(output, exist_ok=True)
+
+    start = time.perf_counter()
+    store = load_detection_store(store_dir)
+    x_range, y_range = REGIONS[args.region]
+    mask = box_mask(store, args.min_conf, x_range, y_range)
+    counters = summarise_store(store, read_categories(args.categories), mask)
+    counters.write_outputs(output)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(store['image'])} stored images ({counters.total_images} with near-identical frames), "
+          f"{int(mask.sum())} of {len(mask)} boxes kept, in {elapsed:.2f}s")
+    print(f"Results saved to: {output}")
+
+if __name__ == "__main__":
+    main()
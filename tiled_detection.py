@@ -0,0 +1,211 @@
+"""Tiled YOLO detection for small, distant people in high-resolution site photos.
+
+A full-frame pass shrinks a 12-MP photo to 640 px, so a worker 50 m from the camera is a
+handful of pixels. Tiled mode cuts the photo into overlapping tiles at the model's input
+size, runs them (plus the full frame, for large objects) as one batch and merges the boxes:
+boxes cut off by a tile seam are dropped (the neighbouring tile or the full frame sees the
+whole object), then global NMS, then any box mostly inside a stronger box of the same class
+is dropped, so one person on a seam is counted once. Run this file directly to compare it
+against full-frame inference:
+
+    python tiled_detection.py "20250214 Raw Data IMS" --limit 50
+"""
+import os
+import time
+import argparse
+import numpy as np
+from PIL import Image
+from image_sources import VideoFrame, IMAGE_EXTENSIONS, detector_input
+
+DEFAULT_TILE_SIZE = 640  # yolov8n's input size - tiles are analysed at native resolution
+DEFAULT_TILE_OVERLAP = 0.2  # Fraction of a tile shared with its neighbour, so people on a seam aren't cut in half
+NMS_IOU_THRESHOLD = 0.5
+CONTAINED_THRESHOLD = 0.8  # Fraction of the smaller box inside the larger for it to count as the same object
+SEAM_MARGIN = 2  # Pixels - a tile box this close to an interior tile edge is cut off by the seam
+DEFAULT_CONF = 0.25  # Ultralytics' own default confidence threshold
+
+def detector_cache_key(model_name, tile_size=None, tile_overlap=DEFAULT_TILE_OVERLAP):
+    """Key for the result cache - tiled and full-frame detections are different results"""
+    if tile_size is None:
+        return model_name
+    return f"{model_name}:tiled-{tile_size}-{tile_overlap}-seams"  # Seam merging changed the tiled results
+
+def tile_boxes(width, height, tile_size=DEFAULT_TILE_SIZE, overlap=DEFAULT_TILE_OVERLAP):
+    """(x0, y0, x1, y1) of overlapping tiles that cover the whole image"""
+    stride = max(1, int(tile_size * (1 - overlap)))
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        positions = list(range(0, length - tile_size, stride))
+        positions.append(length - tile_size)  # Last tile sits flush with the edge
+        return positions
+
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in starts(height)
+        for x in starts(width)
+    ]
+
+def detections_from_results(results):
+    """Boxes of a YOLO result as plain lists (the form the result cache stores)"""
+    return {
+        'cls': [int(cls) for cls in results.boxes.cls.tolist()],
+        'conf': results.boxes.conf.tolist(),
+        'xyxyn': results.boxes.xyxyn.tolist()
+    }
+
+def _touches_seam(boxes, region, width, height, margin=SEAM_MARGIN):
+    """Mask of tile-local boxes that touch an edge of the tile that is inside the image"""
+    import torch
+    x0, y0, x1, y1 = region
+    mask = (boxes[:, 0] <= margin) if x0 > 0 else torch.zeros(len(boxes), dtype=torch.bool)
+    if y0 > 0:
+        mask |= boxes[:, 1] <= margin
+    if x1 < width:
+        mask |= boxes[:, 2] >= x1 - x0 - margin
+    if y1 < height:
+        mask |= boxes[:, 3] >= y1 - y0 - margin
+    return mask
+
+def _suppress_contained(boxes, scores, classes, threshold=CONTAINED_THRESHOLD):
+    """Indices of the boxes left after dropping any box mostly inside a higher-scoring box of the same class.
+
+    IoU misses these: a partial box from a tile is small next to the full box, so their IoU is
+    low even though the partial box lies entirely inside it.
+    """
+    import torch
+    order = scores.argsort(descending=True)
+    boxes, classes = boxes[order], classes[order]
+    areas = (boxes[:, 2] - boxes[:, 0]).clamp(min=0) * (boxes[:, 3] - boxes[:, 1]).clamp(min=0)
+    top_left = torch.max(boxes[:, None, :2], boxes[None, :, :2])
+    bottom_right = torch.min(boxes[:, None, 2:], boxes[None, :, 2:])
+    intersection = (bottom_right - top_left).clamp(min=0).prod(dim=2)
+    contained = intersection / torch.min(areas[:, None], areas[None, :]).clamp(min=1e-6) >= threshold
+    contained &= classes[:, None] == classes[None, :]
+
+    kept = []
+    for index in range(len(boxes)):
+        if not kept or not contained[index, kept].any():
+            kept.append(index)
+    return order[kept]
+
+def detect_tiled(model, image_path, tile_size=DEFAULT_TILE_SIZE, overlap=DEFAULT_TILE_OVERLAP,
+                 include_full_frame=True, iou_threshold=NMS_IOU_THRESHOLD, conf=DEFAULT_CONF):
+    """Detect over overlapping tiles in one batched call and merge the boxes (see the module docstring)"""
+    import torch
+    from torchvision.ops import batched_nms
+
+    if isinstance(image_path, VideoFrame):
+        image = image_path.load()
+    else:
+        with Image.open(image_path) as img:
+            image = np.asarray(img.convert('RGB'))[:, :, ::-1]  # Ultralytics expects BGR arrays, like cv2.imread
+    height, width = image.shape[:2]
+
+    regions = tile_boxes(width, height, tile_size, overlap)
+    crops = [np.ascontiguousarray(image[y0:y1, x0:x1]) for x0, y0, x1, y1 in regions]
+    full_frame = include_full_frame and len(regions) > 1
+    if full_frame:
+        # Large, close-up objects span several tiles - the full frame still finds them in one piece
+        regions.append((0, 0, width, height))
+        crops.append(np.ascontiguousarray(image))
+
+    # One batched call, so torch spreads the whole image's work across all its threads
+    results = model(crops, imgsz=tile_size, conf=conf, verbose=False)
+
+    boxes, scores, classes = [], [], []
+    for region, result in zip(regions, results):
+        if len(result.boxes) == 0:
+            continue
+        region_boxes = result.boxes.xyxy.cpu()
+        region_scores, region_classes = result.boxes.conf.cpu(), result.boxes.cls.cpu()
+        if full_frame and region != (0, 0, width, height):
+            # A box cut by a seam is part of an object another tile (or the full frame) sees whole
+            whole = ~_touches_seam(region_boxes, region, width, height)
+            region_boxes, region_scores, region_classes = region_boxes[whole], region_scores[whole], region_classes[whole]
+        x0, y0 = region[:2]
+        boxes.append(region_boxes + torch.tensor([x0, y0, x0, y0], dtype=torch.float32))
+        scores.append(region_scores)
+        classes.append(region_classes)
+    if not boxes:
+        return {'cls': [], 'conf': [], 'xyxyn': []}
+
+    boxes, scores, classes = torch.cat(boxes), torch.cat(scores), torch.cat(classes)
+    if len(boxes) == 0:
+        return {'cls': [], 'conf': [], 'xyxyn': []}
+    keep = batched_nms(boxes, scores, classes.long(), iou_threshold)
+    keep = keep[_suppress_contained(boxes[keep], scores[keep], classes[keep])]
+    scale = torch.tensor([width, height, width, height], dtype=torch.float32)
+    return {
+        'cls': [int(cls) for cls in classes[keep].tolist()],
+        'conf': scores[keep].tolist(),
+        'xyxyn': (boxes[keep] / scale).tolist()
+    }
+
+def detect_image(model, image_path, tile_size=None, tile_overlap=DEFAULT_TILE_OVERLAP, conf=DEFAULT_CONF):
+    """Full-frame detection, or tiled detection when tile_size is given"""
+    if tile_size is None:
+        return detections_from_results(model(detector_input(image_path), conf=conf, verbose=False)[0])
+    return detect_tiled(model, image_path, tile_size, tile_overlap, conf=conf)
+
+def _matched_boxes(boxes_a, boxes_b, iou_threshold=0.5):
+    """How many boxes in boxes_a have a counterpart in boxes_b"""
+    import torch
+    from torchvision.ops import box_iou
+    if not boxes_a or not boxes_b:
+        return 0
+    iou = box_iou(torch.tensor(boxes_a), torch.tensor(boxes_b))
+    return int((iou.max(dim=1).values >= iou_threshold).sum())
+
+def compare_tiled_vs_full(model, image_paths, tile_size=DEFAULT_TILE_SIZE, tile_overlap=DEFAULT_TILE_OVERLAP):
+    """Run both modes over the same images and print the people found and throughput of each"""
+    person_ids = {class_id for class_id, name in model.names.items() if name == 'person'}
+
+    def people(detections):
+        return [box for cls, box in zip(detections['cls'], detections['xyxyn']) if cls in person_ids]
+
+    full_time = tiled_time = 0.0
+    full_people = tiled_people = agreed = images_with_more = 0
+    for image_path in image_paths:
+        start = time.perf_counter()
+        full = people(detect_image(model, image_path))
+        full_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        tiled = people(detect_image(model, image_path, tile_size, tile_overlap))
+        tiled_time += time.perf_counter() - start
+
+        full_people += len(full)
+        tiled_people += len(tiled)
+        agreed += _matched_boxes(full, tiled)
+        if len(tiled) > len(full):
+            images_with_more += 1
+        print(f"{os.path.basename(image_path)}: {len(full)} people full-frame, {len(tiled)} tiled")
+
+    n = len(image_paths)
+    print("\n=== Tiled vs full-frame detection ===")
+    print(f"Images:                     {n}")
+    print(f"Full-frame:                 {full_people} people, {n / full_time if full_time else 0:.2f} images/s")
+    print(f"Tiled ({tile_size}px, {tile_overlap:.0%} overlap): {tiled_people} people, {n / tiled_time if tiled_time else 0:.2f} images/s")
+    print(f"Full-frame people also found tiled: {agreed}/{full_people}")
+    print(f"Images where tiling found more people: {images_with_more}/{n}")
+    print(f"Tiled mode is {tiled_time / full_time if full_time else 0:.1f}x slower")
+
+if __name__ == "__main__":
+    from ultralytics import YOLO
+
+    parser = argparse.ArgumentParser(description="Compare tiled and full-frame YOLO detection on a folder of images")
+    parser.add_argument('image_dir')
+    parser.add_argument('--model', default='yolov8n.pt')
+    parser.add_argument('--tile-size', type=int, default=DEFAULT_TILE_SIZE)
+    parser.add_argument('--overlap', type=float, default=DEFAULT_TILE_OVERLAP)
+    parser.add_argument('--limit', type=int, default=50, help="Compare on at most this many images")
+    args = parser.parse_args()
+
+    paths = sorted(
+        os.path.join(args.image_dir, filename)
+        for filename in os.listdir(args.image_dir)
+        if filename.lower().endswith(IMAGE_EXTENSIONS)
+    )[:args.limit]
+    compare_tiled_vs_full(YOLO(args.model), paths, args.tile_size, args.overlap)